@@ -1,59 +1,31 @@
 from datetime import date
-import json
+import os
+import sys
 from flask import Flask, render_template,jsonify
-from functools import lru_cache
-import subprocess, requests, re, time
-
-
-@lru_cache()
-def fetch_fanduel(ttl_hash=None):
-    del ttl_hash
-    return fetch_game_data(sportsbook="fanduel")
-
-@lru_cache()
-def fetch_draftkings(ttl_hash=None):
-    del ttl_hash
-    return fetch_game_data(sportsbook="draftkings")
-
-@lru_cache()
-def fetch_betmgm(ttl_hash=None):
-    del ttl_hash
-    return fetch_game_data(sportsbook="betmgm")
-
-def fetch_game_data(sportsbook="fanduel"):
-    cmd = ["python", "main.py", "-xgb", f"-odds={sportsbook}"]
-    stdout = subprocess.check_output(cmd, cwd="../").decode()
-    data_re = re.compile(r'\n(?P<home_team>[\w ]+)(\((?P<home_confidence>[\d+\.]+)%\))? vs (?P<away_team>[\w ]+)(\((?P<away_confidence>[\d+\.]+)%\))?: (?P<ou_pick>OVER|UNDER) (?P<ou_value>[\d+\.]+) (\((?P<ou_confidence>[\d+\.]+)%\))?', re.MULTILINE)
-    ev_re = re.compile(r'(?P<team>[\w ]+) EV: (?P<ev>[-\d+\.]+)', re.MULTILINE)
-    odds_re = re.compile(r'(?P<away_team>[\w ]+) \((?P<away_team_odds>-?\d+)\) @ (?P<home_team>[\w ]+) \((?P<home_team_odds>-?\d+)\)', re.MULTILINE)
-    games = {}
-    for match in data_re.finditer(stdout):
-        game_dict = {'away_team': match.group('away_team').strip(),
-                     'home_team': match.group('home_team').strip(),
-                     'away_confidence': match.group('away_confidence'),
-                     'home_confidence': match.group('home_confidence'),
-                     'ou_pick': match.group('ou_pick'),
-                     'ou_value': match.group('ou_value'),
-                     'ou_confidence': match.group('ou_confidence')}
-        for ev_match in ev_re.finditer(stdout):
-            if ev_match.group('team') == game_dict['away_team']:
-                game_dict['away_team_ev'] = ev_match.group('ev')
-            if ev_match.group('team') == game_dict['home_team']:
-                game_dict['home_team_ev'] = ev_match.group('ev')
-        for odds_match in odds_re.finditer(stdout):
-            if odds_match.group('away_team') == game_dict['away_team']:
-                game_dict['away_team_odds'] = odds_match.group('away_team_odds')
-            if odds_match.group('home_team') == game_dict['home_team']:
-                game_dict['home_team_odds'] = odds_match.group('home_team_odds')
-
-        print(json.dumps(game_dict, sort_keys=True, indent=4))
-        games[f"{game_dict['away_team']}:{game_dict['home_team']}"] = game_dict
-    return games
-
-
-def get_ttl_hash(seconds=600):
-    """Return the same value withing `seconds` time period"""
-    return round(time.time() / seconds)
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.Predict.Prediction_Service import get_prediction_service
+from src.Utils.Concurrent_Fetch import FanOut
+from src.Utils.Http_Client import get_http_client
+from src.Utils.Ttl_Cache import TtlCache
+
+# predictions are recomputed in the background every 10 minutes while visitors get the previous ones,
+# only a first visit or one after hours without traffic waits for the prediction run
+prediction_cache = TtlCache(ttl=600, max_entries=8, max_stale=6 * 60 * 60)
+
+
+def fetch_sportsbooks(sportsbooks=("fanduel", "draftkings", "betmgm")):
+    return prediction_cache.get(sportsbooks, lambda: fetch_game_data(sportsbooks=sportsbooks))
+
+
+def fetch_game_data(sportsbooks=("fanduel",)):
+    data = {}
+    for sportsbook, predictions in get_prediction_service("xgb").predict_all(list(sportsbooks)).items():
+        games = {}
+        for game_dict in predictions:
+            games[f"{game_dict['away_team']}:{game_dict['home_team']}"] = game_dict
+        data[sportsbook] = games
+    return data
 
 
 app = Flask(__name__)
@@ -62,68 +34,83 @@ app.jinja_env.add_extension('jinja2.ext.loopcontrols')
 
 @app.route("/")
 def index():
-    fanduel = fetch_fanduel(ttl_hash=get_ttl_hash())
-    draftkings = fetch_draftkings(ttl_hash=get_ttl_hash())
-    betmgm = fetch_betmgm(ttl_hash=get_ttl_hash())
-
-    return render_template('index.html', today=date.today(), data={"fanduel": fanduel, "draftkings": draftkings, "betmgm": betmgm})
-
-
+    try:
+        data, error = fetch_sportsbooks(), None
+    except Exception:
+        # the page still renders, without picks, and the next visit runs the predictions again
+        app.logger.exception("Today's predictions failed")
+        data, error = {}, "Today's predictions are unavailable right now, try again in a few minutes."
+    return render_template('index.html', today=date.today(), data=data, error=error)
+
+
+
+
+# RapidAPI endpoints live under this URL, point it at a stand-in server to develop or test offline
+rapidapi_base_url = os.environ.get('RAPIDAPI_BASE_URL', 'https://tank01-fantasy-stats.p.rapidapi.com')
+rapidapi_key = os.environ.get('RAPIDAPI_KEY')
+rapidapi_host = "tank01-fantasy-stats.p.rapidapi.com"
+rapidapi_timeout = 10
+
+# rosters barely change during a day and player game logs only after a game, so team and player modals are
+# normally answered from memory
+roster_cache = TtlCache(ttl=6 * 60 * 60, max_entries=64, max_stale=24 * 60 * 60)
+player_cache = TtlCache(ttl=30 * 60, max_entries=512, max_stale=6 * 60 * 60)
+
+
+def get_rapidapi_json(endpoint, params):
+    if not rapidapi_key:
+        raise RuntimeError('Set the RAPIDAPI_KEY environment variable to your RapidAPI key '
+                           'to load team and player data')
+    headers = {"x-rapidapi-key": rapidapi_key, "x-rapidapi-host": rapidapi_host}
+    response = get_http_client().get(f"{rapidapi_base_url}/{endpoint}", headers=headers, params=params,
+                                     budget=rapidapi_timeout)
+    return response.json()
+
+
+def fetch_roster(team_abv):
+    """Formatted roster of a team, raising when RapidAPI does not return one so failures are not cached"""
+    data = get_rapidapi_json("getNBATeamRoster", {"teamAbv": team_abv})
+    if data.get('statusCode') != 200:
+        raise ValueError('Failed to fetch team data')
+
+    formatted_players = []
+    roster = data.get('body', {}).get('roster', [])
+
+    for player in roster:
+        # Format injury status
+        injury_status = "Healthy"
+        if player.get('injury'):
+            injury_info = player['injury']
+            if injury_info.get('designation'):
+                injury_status = injury_info['designation']
+                if injury_info.get('description'):
+                    injury_status += f" - {injury_info['description']}"
+
+        formatted_player = {
+            'name': player.get('longName'),
+            'shortName': player.get('shortName'),
+            'headshot': player.get('nbaComHeadshot'),
+            'injury': injury_status,
+            'position': player.get('pos'),
+            'height': player.get('height'),
+            'weight': player.get('weight'),
+            'college': player.get('college'),
+            'experience': player.get('exp'),
+            'jerseyNum': player.get('jerseyNum'),
+            'playerId': player.get('playerID'),
+            'birthDate': player.get('bDay')
+        }
+        formatted_players.append(formatted_player)
+    return formatted_players
 
 
 def get_player_data(team_abv):
     """Fetch player data for a given team abbreviation"""
-    url = "https://tank01-fantasy-stats.p.rapidapi.com/getNBATeamRoster"
-    headers = {
-        "x-rapidapi-key": "a0f0cd0b5cmshfef96ed37a9cda6p1f67bajsnfcdd16f37df8",
-        "x-rapidapi-host": "tank01-fantasy-stats.p.rapidapi.com"
-    }
-    querystring = {"teamAbv": team_abv}
-    
     try:
-        response = requests.get(url, headers=headers, params=querystring)
-        data = response.json()
-        
-        if data.get('statusCode') == 200:
-            formatted_players = []
-            roster = data.get('body', {}).get('roster', [])
-            
-            for player in roster:
-                # Format injury status
-                injury_status = "Healthy"
-                if player.get('injury'):
-                    injury_info = player['injury']
-                    if injury_info.get('designation'):
-                        injury_status = injury_info['designation']
-                        if injury_info.get('description'):
-                            injury_status += f" - {injury_info['description']}"
-                
-                formatted_player = {
-                    'name': player.get('longName'),
-                    'shortName': player.get('shortName'),
-                    'headshot': player.get('nbaComHeadshot'),
-                    'injury': injury_status,
-                    'position': player.get('pos'),
-                    'height': player.get('height'),
-                    'weight': player.get('weight'),
-                    'college': player.get('college'),
-                    'experience': player.get('exp'),
-                    'jerseyNum': player.get('jerseyNum'),
-                    'playerId': player.get('playerID'),
-                    'birthDate': player.get('bDay')
-                }
-                formatted_players.append(formatted_player)
-            
-            return {
-                'success': True,
-                'players': formatted_players
-            }
-        
         return {
-            'success': False,
-            'error': 'Failed to fetch team data'
+            'success': True,
+            'players': roster_cache.get(team_abv, lambda: fetch_roster(team_abv))
         }
-        
     except Exception as e:
         print(f"Error in get_player_data: {str(e)}")
         return {
@@ -148,70 +135,56 @@ def team_data(team_name):
     return jsonify(result)
 
 
-    
+def fetch_player_stats(player_id):
+    """Player info and last 10 games, raising when RapidAPI does not return both so failures are not cached"""
+    # player info and game stats are independent, request them at the same time
+    fetches = FanOut()
+    fetches.submit('info', get_rapidapi_json, "getNBAPlayerInfo", {"playerID": player_id}, timeout=rapidapi_timeout)
+    fetches.submit('games', get_rapidapi_json, "getNBAGamesForPlayer", {"playerID": player_id, "season": "2024"},
+                   timeout=rapidapi_timeout)
+    info_data = fetches.result('info')
+    games_data = fetches.result('games')
+
+    if info_data.get('statusCode') != 200 or games_data.get('statusCode') != 200:
+        raise ValueError('Failed to fetch player data')
+
+    # Process games data
+    games = list(games_data['body'].values())
+    games.sort(key=lambda x: x['gameID'], reverse=True)
+    recent_games = games[:10]
+
+    # Get player info
+    player_info = info_data['body']
+
+    # Format injury info
+    injury_status = "Healthy"
+    if player_info.get('injury'):
+        injury_info = player_info['injury']
+        injury_status = injury_info
+
+    # Combine and return all data
+    return {
+        'success': True,
+        'games': recent_games,
+        'player': {
+            'name': player_info.get('longName'),
+            'position': player_info.get('pos'),
+            'number': player_info.get('jerseyNum'),
+            'height': player_info.get('height'),
+            'weight': player_info.get('weight'),
+            'team': player_info.get('team'),
+            'college': player_info.get('college'),
+            'experience': player_info.get('exp'),
+            'headshot': player_info.get('nbaComHeadshot'),
+            'injury': injury_status
+        }
+    }
+
+
 @app.route("/player-stats/<player_id>")
 def player_stats(player_id):
-    headers = {
-        "x-rapidapi-key": "a0f0cd0b5cmshfef96ed37a9cda6p1f67bajsnfcdd16f37df8",
-        "x-rapidapi-host": "tank01-fantasy-stats.p.rapidapi.com"
-    }
-    
-    # First get player info
-    info_url = "https://tank01-fantasy-stats.p.rapidapi.com/getNBAPlayerInfo"
-    info_querystring = {"playerID": player_id}
-    
-    # Then get game stats
-    games_url = "https://tank01-fantasy-stats.p.rapidapi.com/getNBAGamesForPlayer"
-    games_querystring = {
-        "playerID": player_id,
-        "season": "2024",
-    }
-    
     try:
-        # Get both responses
-        info_response = requests.get(info_url, headers=headers, params=info_querystring)
-        games_response = requests.get(games_url, headers=headers, params=games_querystring)
-        
-        info_data = info_response.json()
-        games_data = games_response.json()
-        
-        if info_data.get('statusCode') == 200 and games_data.get('statusCode') == 200:
-            # Process games data
-            games = list(games_data['body'].values())
-            games.sort(key=lambda x: x['gameID'], reverse=True)
-            recent_games = games[:10]
-            
-            # Get player info
-            player_info = info_data['body']
-            
-            # Format injury info
-            injury_status = "Healthy"
-            if player_info.get('injury'):
-                injury_info = player_info['injury']
-                injury_status = injury_info
-
-            # Combine and return all data
-            return jsonify({
-                'success': True,
-                'games': recent_games,
-                'player': {
-                    'name': player_info.get('longName'),
-                    'position': player_info.get('pos'),
-                    'number': player_info.get('jerseyNum'),
-                    'height': player_info.get('height'),
-                    'weight': player_info.get('weight'),
-                    'team': player_info.get('team'),
-                    'college': player_info.get('college'),
-                    'experience': player_info.get('exp'),
-                    'headshot': player_info.get('nbaComHeadshot'),
-                    'injury': injury_status
-                }
-            })
-            
-        return jsonify({
-            'success': False,
-            'error': 'Failed to fetch player data'
-        })
+        return jsonify(player_cache.get(player_id, lambda: fetch_player_stats(player_id)))
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Utils.Backtest import WalkForwardBacktest, betting_results, max_drawdown
+from src.Utils.Feature_Store import write_feature_store
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_betting_results_takes_positive_ev_side(self):
+        # 60% home at +100 is +EV, the away side at -150 is not; second game has no odds
+        bets, expected, profit, curve = betting_results([0.6, 0.5], [1, 0], [100, np.nan], [-150, 120])
+        self.assertEqual(bets, 1)
+        self.assertAlmostEqual(expected, 0.2)
+        self.assertAlmostEqual(profit, 1.0)
+        self.assertAlmostEqual(curve[-1], 1.2)
+
+    def test_losing_bet_shrinks_bankroll(self):
+        bets, expected, profit, curve = betting_results([0.6], [0], [100], [-150], kelly_fraction=0.5)
+        self.assertAlmostEqual(profit, -1.0)
+        self.assertAlmostEqual(curve[-1], 0.9)
+
+    def test_max_drawdown(self):
+        self.assertAlmostEqual(max_drawdown(np.array([1.2, 0.9, 1.5])), 0.25)
+        self.assertEqual(max_drawdown(np.array([])), 0.0)
+
+    def test_walk_forward_folds(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        frame = pd.DataFrame(rng.random((n, 2)), columns=['PTS', 'PTS.1'])
+        frame['Date'] = [f"{2010 + i // 50}-11-01" for i in range(n)]
+        frame['Score'] = 220.0
+        frame['Home-Team-Win'] = (frame['PTS'] > frame['PTS.1']).astype(float)
+        frame['OU'] = 221.5
+        frame['OU-Cover'] = 0.0
+        frame['ML_Home'] = -110.0
+        frame['ML_Away'] = -110.0
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_feature_store(frame, 'dataset_test', tmp_dir)
+            params = {'max_depth': 2, 'eta': 0.3, 'objective': 'multi:softprob', 'num_class': 2}
+            with WalkForwardBacktest('dataset_test', 'ml', 'Home-Team-Win', min_train_seasons=2, workers=1,
+                                     store_path=tmp_dir) as backtest:
+                report, curves = backtest.run(params, 20)
+                again, _ = backtest.run(params, 20)
+        self.assertEqual(list(report['season']), ['2012-13', '2013-14'])
+        self.assertEqual(list(report['games']), [50, 50])
+        self.assertTrue((report['accuracy'] > 70).all())
+        self.assertEqual(set(curves), {'2012-13', '2013-14'})
+        pd.testing.assert_frame_equal(report, again)
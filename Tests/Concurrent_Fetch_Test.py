@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from src.Utils.Concurrent_Fetch import FanOut, SourceTimeout
+
+
+def slow(value, seconds):
+    time.sleep(seconds)
+    return value
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_sources_run_at_the_same_time(self):
+        start = time.perf_counter()
+        fetches = FanOut()
+        for name in ('odds', 'team stats', 'schedule'):
+            fetches.submit(name, slow, name, 0.2, timeout=5)
+        results = [fetches.result(name) for name in ('odds', 'team stats', 'schedule')]
+        self.assertEqual(results, ['odds', 'team stats', 'schedule'])
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(set(fetches.timings), {'odds', 'team stats', 'schedule'})
+
+    def test_timeout_only_fails_that_source(self):
+        fetches = FanOut()
+        fetches.submit('odds', slow, 'odds', 1, timeout=0.1)
+        fetches.submit('team stats', slow, 'stats', 0, timeout=5)
+        self.assertEqual(fetches.result('team stats'), 'stats')
+        start = time.perf_counter()
+        with self.assertRaises(SourceTimeout):
+            fetches.result('odds')
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_errors_are_reraised(self):
+        fetches = FanOut()
+        fetches.submit('team stats', int, 'not a number', timeout=5)
+        with self.assertRaises(ValueError):
+            fetches.result('team stats')
+
+    def test_abandoned_source_does_not_delay_exit(self):
+        script = ("import time\n"
+                  "from src.Utils.Concurrent_Fetch import FanOut, SourceTimeout\n"
+                  "fetches = FanOut()\n"
+                  "fetches.submit('odds', time.sleep, 10, timeout=0.1)\n"
+                  "try:\n"
+                  "    fetches.result('odds')\n"
+                  "except SourceTimeout:\n"
+                  "    print('timed out')\n")
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=30,
+                                cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        self.assertEqual(output.stdout.strip(), 'timed out')
+        self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Utils.Feature_Store import FeatureStore, write_feature_store
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.frame = pd.DataFrame({
+            'TEAM_NAME': ['Boston Celtics', 'Miami Heat', 'Utah Jazz'],
+            'PTS': rng.random(3), 'W_PCT': rng.random(3), 'Date': ['2023-10-24'] * 3,
+            'TEAM_NAME.1': ['Denver Nuggets', 'Orlando Magic', 'Chicago Bulls'],
+            'PTS.1': rng.random(3), 'W_PCT.1': rng.random(3), 'Date.1': ['2023-10-24'] * 3,
+            'Score': [210.0, 232.0, 221.0], 'Home-Team-Win': [1.0, 0.0, 1.0], 'OU': [215.5, 225.0, 221.0],
+            'OU-Cover': [0.0, 1.0, 2.0], 'Days-Rest-Home': [2.0, 1.0, 3.0], 'Days-Rest-Away': [1.0, 1.0, 2.0],
+        })
+        write_feature_store(self.frame, 'dataset_test', self.tmp_dir.name)
+        self.store = FeatureStore.open('dataset_test', self.tmp_dir.name)
+
+    def tearDown(self):
+        del self.store
+        self.tmp_dir.cleanup()
+
+    def test_ml_features_match_dropped_frame(self):
+        expected = self.frame.drop(['Score', 'Home-Team-Win', 'TEAM_NAME', 'Date', 'TEAM_NAME.1', 'Date.1',
+                                    'OU-Cover', 'OU'], axis=1).values.astype(np.float32)
+        np.testing.assert_array_equal(self.store.ml_features(), expected)
+
+    def test_ou_features_end_with_line(self):
+        features = self.store.ou_features()
+        self.assertEqual(self.store.feature_columns[-1], 'OU')
+        np.testing.assert_array_equal(features[:, -1], self.frame['OU'].values.astype(np.float32))
+
+    def test_adjacent_columns_are_views(self):
+        self.assertIsInstance(self.store.features(), np.memmap)
+        self.assertTrue(np.shares_memory(self.store.ml_features(), self.store.features()))
+        self.assertFalse(np.shares_memory(self.store.features(['PTS', 'PTS.1']), self.store.features()))
+
+    def test_labels(self):
+        self.assertEqual(len(self.store), 3)
+        np.testing.assert_array_equal(self.store.label('OU-Cover'), [0, 1, 2])
+        np.testing.assert_array_equal(self.store.label('Home-Team-Win'), [1, 0, 1])
+
+    def test_version_mismatch(self):
+        self.store.manifest['version'] = 0
+        with open(os.path.join(self.tmp_dir.name, 'dataset_test', 'manifest.json'), 'w') as f:
+            json.dump(self.store.manifest, f)
+        with self.assertRaises(ValueError):
+            FeatureStore.open('dataset_test', self.tmp_dir.name)
@@ -0,0 +1,195 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Flask'))
+import app as flask_app
+from src.Utils.Ttl_Cache import TtlCache
+
+
+class RapidApiStandIn(BaseHTTPRequestHandler):
+    """Answers the three tank01 endpoints the app uses, each after `delay` seconds"""
+    delay = 0.2
+    calls = []
+    keys = []
+    status_code = 200
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.calls.append(url.path)
+        self.keys.append(self.headers.get('x-rapidapi-key'))
+        time.sleep(self.delay)
+        if url.path == '/getNBATeamRoster':
+            body = {'roster': [{'longName': 'Jayson Tatum', 'playerID': '1', 'pos': 'SF',
+                                'injury': {'designation': 'Day-To-Day', 'description': 'Ankle'}}]}
+        elif url.path == '/getNBAPlayerInfo':
+            body = {'longName': 'Jayson Tatum', 'playerID': params['playerID'], 'team': 'BOS', 'pos': 'SF'}
+        else:
+            body = {f'202411{day:02d}_BOS': {'gameID': f'202411{day:02d}_BOS', 'pts': str(20 + day)}
+                    for day in range(1, 14)}
+        payload = json.dumps({'statusCode': self.status_code, 'body': body}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPlayerEndpoints(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RapidApiStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url, cls.key = flask_app.rapidapi_base_url, flask_app.rapidapi_key
+        flask_app.rapidapi_base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        flask_app.rapidapi_key = 'stand-in-key'
+        cls.client = flask_app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        flask_app.rapidapi_base_url, flask_app.rapidapi_key = cls.base_url, cls.key
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RapidApiStandIn.calls = []
+        RapidApiStandIn.keys = []
+        RapidApiStandIn.status_code = 200
+        flask_app.roster_cache = TtlCache(ttl=60)
+        flask_app.player_cache = TtlCache(ttl=60)
+
+    def test_roster_served_from_memory(self):
+        first = self.client.get('/team-data/Boston Celtics').get_json()
+        start = time.perf_counter()
+        second = self.client.get('/team-data/Boston Celtics').get_json()
+        self.assertLess(time.perf_counter() - start, RapidApiStandIn.delay)
+        self.assertEqual(first, second)
+        self.assertEqual(first['players'][0]['injury'], 'Day-To-Day - Ankle')
+        self.assertEqual(RapidApiStandIn.calls, ['/getNBATeamRoster'])
+        self.assertEqual(RapidApiStandIn.keys, ['stand-in-key'])
+
+    def test_player_calls_run_concurrently(self):
+        start = time.perf_counter()
+        result = self.client.get('/player-stats/1').get_json()
+        self.assertLess(time.perf_counter() - start, 2 * RapidApiStandIn.delay)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['player']['team'], 'BOS')
+        self.assertEqual(len(result['games']), 10)
+        self.assertEqual(result['games'][0]['gameID'], '20241113_BOS')
+        self.assertEqual(sorted(RapidApiStandIn.calls), ['/getNBAGamesForPlayer', '/getNBAPlayerInfo'])
+        self.client.get('/player-stats/1')
+        self.assertEqual(len(RapidApiStandIn.calls), 2)
+
+    def test_upstream_failure_not_cached(self):
+        RapidApiStandIn.status_code = 500
+        result = self.client.get('/team-data/Boston Celtics').get_json()
+        self.assertEqual(result, {'success': False, 'error': 'Failed to fetch team data'})
+        RapidApiStandIn.status_code = 200
+        self.assertTrue(self.client.get('/team-data/Boston Celtics').get_json()['success'])
+        self.assertEqual(len(RapidApiStandIn.calls), 2)
+
+    def test_missing_key_fails_clearly(self):
+        flask_app.rapidapi_key = None
+        try:
+            result = self.client.get('/team-data/Boston Celtics').get_json()
+        finally:
+            flask_app.rapidapi_key = 'stand-in-key'
+        self.assertFalse(result['success'])
+        self.assertIn('RAPIDAPI_KEY', result['error'])
+        self.assertEqual(RapidApiStandIn.calls, [])
+
+
+class StubPredictionService:
+    """Prediction service returning one game per sportsbook, or raising `error` when it is set"""
+    error = None
+    calls = 0
+    home_confidence = 71.5
+
+    def predict_all(self, sportsbooks):
+        StubPredictionService.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {sportsbook: [{'home_team': 'Boston Celtics', 'away_team': 'Miami Heat', 'home_confidence': self.home_confidence,
+                              'away_confidence': None, 'ou_pick': None, 'ou_value': 220.5, 'ou_confidence': None,
+                              'home_team_odds': -150, 'away_team_odds': 130, 'home_team_ev': 4.2,
+                              'away_team_ev': -8.1, 'home_kelly': 0, 'away_kelly': 0}]
+                for sportsbook in sportsbooks}
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        StubPredictionService.error = None
+        StubPredictionService.calls = 0
+        StubPredictionService.home_confidence = 71.5
+        self.get_prediction_service = flask_app.get_prediction_service
+        flask_app.get_prediction_service = lambda model: StubPredictionService()
+        flask_app.prediction_cache = TtlCache(ttl=60)
+        self.client = flask_app.app.test_client()
+
+    def tearDown(self):
+        flask_app.get_prediction_service = self.get_prediction_service
+
+    def test_renders_predictions(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        page = response.get_data(as_text=True)
+        self.assertIn('Miami Heat', page)
+        self.assertIn('71.5%', page)
+        self.assertNotIn('unavailable', page)
+
+    def test_prediction_error_renders_page(self):
+        StubPredictionService.error = FileNotFoundError('Models/XGBoost_Models/missing.json')
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        page = response.get_data(as_text=True)
+        self.assertIn('unavailable', page)
+        self.assertNotIn('Miami Heat', page)
+        # the failure is not cached, the next visit predicts again
+        StubPredictionService.error = None
+        self.assertIn('Miami Heat', self.client.get('/').get_data(as_text=True))
+        self.assertEqual(StubPredictionService.calls, 2)
+
+    def wait_for_calls(self, calls):
+        deadline = time.monotonic() + 5
+        while StubPredictionService.calls < calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # let the refresh store its value, and start no other refresh that could outlive the test
+        time.sleep(0.05)
+        flask_app.prediction_cache.ttl = 60
+
+    def test_cached_predictions(self):
+        self.client.get('/')
+        StubPredictionService.home_confidence = 80.5
+        self.assertIn('71.5%', self.client.get('/').get_data(as_text=True))
+        self.assertEqual(StubPredictionService.calls, 1)
+
+    def test_stale_predictions_refreshed_in_background(self):
+        flask_app.prediction_cache = TtlCache(ttl=0.05, max_stale=60)
+        self.client.get('/')
+        time.sleep(0.1)
+        StubPredictionService.home_confidence = 80.5
+        # the stale page is served right away while the predictions run again
+        self.assertIn('71.5%', self.client.get('/').get_data(as_text=True))
+        self.wait_for_calls(2)
+        self.assertIn('80.5%', self.client.get('/').get_data(as_text=True))
+
+    def test_failing_refresh_keeps_stale_predictions(self):
+        flask_app.prediction_cache = TtlCache(ttl=0.05, max_stale=60)
+        self.client.get('/')
+        time.sleep(0.1)
+        StubPredictionService.error = TimeoutError('odds did not respond within 30 seconds')
+        self.client.get('/')
+        self.wait_for_calls(2)
+        page = self.client.get('/').get_data(as_text=True)
+        self.assertIn('71.5%', page)
+        self.assertNotIn('unavailable', page)
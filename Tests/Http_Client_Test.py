@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from src.Utils.Http_Client import CircuitOpenError, HttpClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    # status codes to answer with, in order, 200 once they run out
+    statuses = []
+
+    def do_GET(self):
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 'bad gzip':
+            # a body that claims to be gzip but is not, requests fails it with ContentDecodingError
+            self.send_response(200)
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', '12')
+            self.end_headers()
+            self.wfile.write(b'{"ok": true}')
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"ok": true}')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), FlakyHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/stats"
+        cls.host = f"127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_retries_server_errors(self):
+        FlakyHandler.statuses = [503, 502]
+        client = HttpClient(retries=2, backoff=0)
+        response = client.get(self.url)
+        self.assertEqual(response.json(), {'ok': True})
+        stats = client.stats()[self.host]
+        self.assertEqual((stats['requests'], stats['errors'], stats['retries']), (3, 2, 2))
+        self.assertEqual(stats['circuit'], 'closed')
+
+    def test_returns_last_response_when_retries_run_out(self):
+        FlakyHandler.statuses = [500, 500]
+        response = HttpClient(retries=1, backoff=0).get(self.url)
+        self.assertEqual(response.status_code, 500)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        FlakyHandler.statuses = [500, 500]
+        client = HttpClient(retries=0, backoff=0, failure_threshold=2, reset_timeout=60)
+        client.get(self.url)
+        client.get(self.url)
+        with self.assertRaises(CircuitOpenError):
+            client.get(self.url)
+        self.assertEqual(client.stats()[self.host]['rejected'], 1)
+        self.assertEqual(client.stats()[self.host]['circuit'], 'open')
+
+    def test_half_open_circuit_closes_on_success(self):
+        FlakyHandler.statuses = [500]
+        client = HttpClient(retries=0, backoff=0, failure_threshold=1, reset_timeout=0)
+        client.get(self.url)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertEqual(client.stats()[self.host]['circuit'], 'closed')
+
+    def test_budget_stops_retries(self):
+        FlakyHandler.statuses = [503] * 3
+        client = HttpClient(retries=2, backoff=1)
+        start = time.perf_counter()
+        self.assertEqual(client.get(self.url, budget=0.5).status_code, 503)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(client.stats()[self.host]['requests'], 1)
+        FlakyHandler.statuses = []
+
+    def test_other_error_during_half_open_trial_ends_it(self):
+        FlakyHandler.statuses = [500, 'bad gzip']
+        client = HttpClient(retries=0, backoff=0, failure_threshold=1, reset_timeout=0)
+        client.get(self.url)
+        with self.assertRaises(requests.exceptions.ContentDecodingError):
+            client.get(self.url)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertEqual(client.stats()[self.host]['circuit'], 'closed')
+
+    def test_connection_errors_raise(self):
+        client = HttpClient(retries=1, backoff=0, timeout=1)
+        with self.assertRaises(requests.ConnectionError):
+            client.get("http://127.0.0.1:9/")
+        self.assertEqual(client.stats()['127.0.0.1:9']['errors'], 2)
+
+    def test_breaker_disabled(self):
+        FlakyHandler.statuses = [500] * 4
+        client = HttpClient(retries=0, backoff=0, failure_threshold=None)
+        for _ in range(4):
+            self.assertEqual(client.get(self.url).status_code, 500)
+        self.assertEqual(client.stats()[self.host]['circuit'], 'closed')
@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Utils.Feature_Store import write_feature_store
+from src.Utils.Hyperparameter_Search import sample_config, successive_halving, xgb_space
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        n = 120
+        frame = pd.DataFrame(rng.random((n, 4)), columns=['PTS', 'W_PCT', 'PTS.1', 'W_PCT.1'])
+        frame['Score'] = 220.0
+        frame['Home-Team-Win'] = (frame['PTS'] > frame['PTS.1']).astype(float)
+        frame['OU'] = 221.5
+        frame['OU-Cover'] = 0.0
+        write_feature_store(frame, 'dataset_test', self.tmp_dir.name)
+        self.results_path = os.path.join(self.tmp_dir.name, 'trials.sqlite')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sample_config_within_space(self):
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            config = sample_config(xgb_space, rng)
+            self.assertTrue(2 <= config['max_depth'] <= 20)
+            self.assertTrue(0.005 <= config['eta'] <= 0.3)
+            self.assertTrue(0.5 <= config['subsample'] <= 1.0)
+
+    def test_successive_halving_promotes_best(self):
+        best = successive_halving('study_test', 'xgb', 'dataset_test', 'ml', 'Home-Team-Win', 9, 3, 27, seed=2,
+                                  store_path=self.tmp_dir.name, results_path=self.results_path)
+        con = sqlite3.connect(self.results_path)
+        rungs = dict(con.execute('select rung, count(*) from "study_trials" group by rung').fetchall())
+        con.close()
+        self.assertEqual(rungs, {0: 9, 1: 3, 2: 1})
+        trial, resource, params, loss, accuracy = best[0]
+        self.assertEqual(resource, 27)
+        self.assertIn('max_depth', params)
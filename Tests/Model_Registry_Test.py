@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import xgboost as xgb
+
+from src.Predict.Model_Registry import ModelRegistry, manifest_file
+from src.Predict.Prediction_Results import build_results
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        train = xgb.DMatrix(rng.random((20, 4)), label=rng.integers(2, size=20))
+        booster = xgb.train({'objective': 'binary:logistic'}, train, 2)
+        booster.save_model(os.path.join(self.tmp_dir.name, 'ml.json'))
+        self.manifest_path = os.path.join(self.tmp_dir.name, 'models.json')
+        self.write_manifest(4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_manifest(self, n_features):
+        manifest = {
+            'version': 1,
+            'active': {'xgb': {'ml': 'ml', 'ou': 'ou'}},
+            'models': [
+                {'id': 'ml', 'type': 'xgboost', 'market': 'ml', 'path': 'ml.json', 'features': {'count': n_features}},
+                {'id': 'ou', 'type': 'xgboost', 'market': 'ou', 'path': 'missing.json', 'features': {'count': 5}},
+            ]
+        }
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+    def test_loads_lazily_and_caches(self):
+        registry = ModelRegistry(self.manifest_path)
+        self.assertEqual(registry._loaded, {})
+        model = registry.get('xgb', 'ml')
+        self.assertIs(registry.get('xgb', 'ml'), model)
+        self.assertEqual(list(registry._loaded), ['ml'])
+
+    def test_missing_model_fails_on_use(self):
+        registry = ModelRegistry(self.manifest_path)
+        with self.assertRaises(FileNotFoundError):
+            registry.get('xgb', 'ou')
+
+    def test_available(self):
+        registry = ModelRegistry(self.manifest_path)
+        self.assertTrue(registry.available('xgb', 'ml'))
+        self.assertFalse(registry.available('xgb', 'ou'))
+
+    def test_results_without_ou_model(self):
+        ml_predictions = np.array([[0.3, 0.7], [0.6, 0.4]])
+        results = build_results(ml_predictions, None, [['Boston Celtics', 'Miami Heat'], ['Utah Jazz', 'Denver Nuggets']],
+                                [220.5, 230.5], [-150, 120], [130, -140], False)
+        first, second = results['predictions']
+        self.assertEqual(first['winner'], 'Boston Celtics')
+        self.assertEqual(second['winner'], 'Denver Nuggets')
+        self.assertEqual(first['winner_confidence'], 70.0)
+        self.assertIsNone(first['ou_pick'])
+        self.assertIsNone(first['ou_confidence'])
+        self.assertEqual(len(results['expected_values']), 2)
+
+    def test_feature_count_mismatch(self):
+        self.write_manifest(3)
+        with self.assertRaises(ValueError):
+            ModelRegistry(self.manifest_path).get('xgb', 'ml')
+
+    def test_unknown_family(self):
+        with self.assertRaises(KeyError):
+            ModelRegistry(self.manifest_path).get('nn', 'ml')
+
+    def test_repo_manifest_paths(self):
+        registry = ModelRegistry(manifest_file)
+        for family, markets in registry.active.items():
+            for market, model_id in markets.items():
+                self.assertEqual(registry.models[model_id]['market'], market)
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Predict import Prediction_Service
+from src.Predict.Prediction_Service import PredictionService
+from src.Utils.Team_Registry import get_team_id
+
+
+def book_odds(home_line, away_line, total):
+    return {
+        'Boston Celtics:Miami Heat': {'under_over_odds': total, 'Boston Celtics': {'money_line_odds': home_line},
+                                      'Miami Heat': {'money_line_odds': away_line}},
+        'Utah Jazz:Denver Nuggets': {'under_over_odds': total + 10, 'Utah Jazz': {'money_line_odds': away_line},
+                                     'Denver Nuggets': {'money_line_odds': home_line}},
+    }
+
+
+class StubRunner:
+    """Money line model favouring the home team, O/U model favouring the over"""
+    ml_calls = 0
+
+    @classmethod
+    def predict_ml(cls, data):
+        cls.ml_calls += 1
+        return np.tile([0.25, 0.75], (len(data), 1))
+
+    @staticmethod
+    def predict_ou(frame_ml, todays_games_uo):
+        return np.tile([0.4, 0.6], (len(todays_games_uo), 1))
+
+
+class TestPredictionService(unittest.TestCase):
+
+    def setUp(self):
+        StubRunner.ml_calls = 0
+        self.get_runner = Prediction_Service.get_runner
+        Prediction_Service.get_runner = lambda model: StubRunner
+        # Utah has no row in the stats snapshot, so its game is left out
+        teams = ['Boston Celtics', 'Miami Heat', 'Denver Nuggets']
+        self.team_stats = pd.DataFrame({'TEAM_ID': [get_team_id(team) for team in teams], 'TEAM_NAME': teams,
+                                        'PTS': [118.0, 109.0, 114.0], 'REB': [45.0, 43.0, 46.0]})
+        self.odds = {'fanduel': book_odds(-150, 130, 220.5), 'draftkings': book_odds(-160, 140, 221.5)}
+        self.service = PredictionService()
+        self.service.get_team_stats = lambda: self.team_stats
+        self.service._get_all_odds = lambda sportsbooks: {book: self.odds[book] for book in sportsbooks}
+
+    def tearDown(self):
+        Prediction_Service.get_runner = self.get_runner
+
+    def test_predict_all(self):
+        results = self.service.predict_all(['fanduel', 'draftkings'])
+        self.assertEqual(StubRunner.ml_calls, 1)
+        self.assertEqual(list(results), ['fanduel', 'draftkings'])
+        fanduel, = results['fanduel']
+        draftkings, = results['draftkings']
+        self.assertEqual((fanduel['home_team'], fanduel['away_team']), ('Boston Celtics', 'Miami Heat'))
+        self.assertEqual(fanduel['home_confidence'], 75.0)
+        self.assertIsNone(fanduel['away_confidence'])
+        self.assertEqual((fanduel['ou_pick'], fanduel['ou_confidence']), ('OVER', 60.0))
+        self.assertEqual((fanduel['ou_value'], fanduel['home_team_odds']), (220.5, -150))
+        self.assertEqual((draftkings['ou_value'], draftkings['home_team_odds']), (221.5, -160))
+
+    def test_no_games(self):
+        self.odds = {'fanduel': {}}
+        self.assertEqual(self.service.predict_all(['fanduel']), {'fanduel': []})
+        self.assertEqual(StubRunner.ml_calls, 0)
+
+    def test_missing_team_stats_raise(self):
+        self.team_stats = pd.DataFrame()
+        with self.assertRaises(ValueError):
+            self.service.predict_all(['fanduel'])
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from src.Utils.Http_Client import HttpClient
+from src.Utils.Response_Cache import ResponseCache, cache_key
+
+
+class StatsHandler(BaseHTTPRequestHandler):
+    etag = '"v1"'
+    requests_seen = []
+    fail = False
+    error_page = False
+
+    def do_GET(self):
+        self.requests_seen.append(self.headers.get('If-None-Match'))
+        if self.fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.error_page:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.end_headers()
+            self.wfile.write(b'<html>Access Denied</html>')
+            return
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"resultSets": []}')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestResponseCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), StatsHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/stats"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp_dir.name, 'cache.sqlite'))
+        self.client = HttpClient(retries=0, backoff=0, cache=self.cache)
+        StatsHandler.requests_seen = []
+        StatsHandler.fail = False
+        StatsHandler.error_page = False
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_fresh_response_skips_the_network(self):
+        self.client.get(self.url, params={'b': 1, 'a': 2}, cache_ttl=60)
+        response = self.client.get(self.url, params={'a': 2, 'b': 1}, cache_ttl=60)
+        self.assertEqual(response.json(), {'resultSets': []})
+        self.assertEqual(len(StatsHandler.requests_seen), 1)
+
+    def test_stale_response_is_revalidated(self):
+        self.client.get(self.url, cache_ttl=0)
+        response = self.client.get(self.url, cache_ttl=0)
+        self.assertEqual(StatsHandler.requests_seen, [None, '"v1"'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'resultSets': []})
+        self.assertEqual(self.client.stats()[f"127.0.0.1:{self.server.server_port}"]['revalidated'], 1)
+
+    def test_last_good_response_when_server_fails(self):
+        self.client.get(self.url, cache_ttl=0)
+        StatsHandler.fail = True
+        self.assertEqual(self.client.get(self.url, cache_ttl=0).json(), {'resultSets': []})
+
+    def test_rejected_body_not_cached(self):
+        def validate(response):
+            return response.headers.get('Content-Type') == 'application/json'
+
+        StatsHandler.error_page = True
+        self.assertEqual(self.client.get(self.url, cache_ttl=60, validate=validate).status_code, 200)
+        self.assertIsNone(self.cache.get(cache_key(self.url)))
+        StatsHandler.error_page = False
+        self.client.get(self.url, cache_ttl=0, validate=validate)
+        StatsHandler.error_page = True
+        response = self.client.get(self.url, cache_ttl=0, validate=validate)
+        self.assertEqual(response.json(), {'resultSets': []})
+
+    def test_offline_serves_cache_only(self):
+        self.client.get(self.url, cache_ttl=0)
+        self.client.offline = True
+        self.assertEqual(self.client.get(self.url, cache_ttl=0).json(), {'resultSets': []})
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get(self.url + '?other=1', cache_ttl=0)
+        self.assertEqual(len(StatsHandler.requests_seen), 1)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.max_bytes = 2 * len(b'{"resultSets": []}')
+        for name in ('a', 'b'):
+            self.client.get(f"{self.url}?{name}=1", cache_ttl=60)
+        self.client.get(f"{self.url}?a=1", cache_ttl=60)
+        self.client.get(f"{self.url}?c=1", cache_ttl=60)
+        self.assertIsNotNone(self.cache.get(cache_key(self.url, {'a': 1})))
+        self.assertIsNone(self.cache.get(cache_key(self.url, {'b': 1})))
+        self.assertIsNotNone(self.cache.get(cache_key(self.url, {'c': 1})))
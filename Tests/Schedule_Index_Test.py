@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from src.Utils.Schedule_Index import ScheduleIndex
+
+schedule_2023 = """Match Number,Round Number,Date,Location,Home Team,Away Team,Result
+1,1,24/10/2023 23:30,Ball Arena,Denver Nuggets,Los Angeles Lakers,
+2,1,26/10/2023 02:00,Chase Center,Golden State Warriors,Denver Nuggets,
+"""
+
+schedule_2024 = """Match Number,Round Number,Date,Location,Home Team,Away Team,Result
+1,1,22/10/2024 23:30,TD Garden,Boston Celtics,New York Knicks,
+2,1,25/10/2024 00:00,Madison Square Garden,New York Knicks,Denver Nuggets,
+"""
+
+
+class TestScheduleIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name, content in (('nba-2023-UTC.csv', schedule_2023), ('nba-2024-UTC.csv', schedule_2024)):
+            path = os.path.join(self.tmp_dir.name, name)
+            with open(path, 'w') as f:
+                f.write(content)
+            self.paths.append(path)
+        self.index = ScheduleIndex.from_csvs(self.paths)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_last_game_before(self):
+        result = self.index.last_game_before('Denver Nuggets', datetime(2024, 1, 1))
+        self.assertEqual(result, datetime(2023, 10, 26, 2, 0))
+
+    def test_last_game_before_includes_exact_time(self):
+        result = self.index.last_game_before('New York Knicks', datetime(2024, 10, 22, 23, 30))
+        self.assertEqual(result, datetime(2024, 10, 22, 23, 30))
+
+    def test_last_game_before_first_game(self):
+        result = self.index.last_game_before('Boston Celtics', datetime(2024, 10, 1))
+        self.assertIsNone(result)
+
+    def test_days_rest(self):
+        result = self.index.days_rest('New York Knicks', datetime(2024, 10, 24, 12, 0))
+        self.assertEqual(result, 2)
+
+    def test_days_rest_no_previous_game(self):
+        result = self.index.days_rest('Boston Celtics', datetime(2024, 10, 1))
+        self.assertEqual(result, 7)
+
+    def test_days_rest_unknown_team(self):
+        result = self.index.days_rest('Seattle SuperSonics', datetime(2024, 10, 24))
+        self.assertEqual(result, 7)
+
+    def test_load_uses_disk_cache(self):
+        cache_path = os.path.join(self.tmp_dir.name, 'schedule_index.pkl')
+        ScheduleIndex.load(self.paths, cache_path=cache_path)
+        self.assertTrue(os.path.exists(cache_path))
+        result = ScheduleIndex.load(self.paths, cache_path=cache_path)
+        self.assertEqual(result.source_key, self.index.source_key)
+        self.assertEqual(len(result.team_games['Denver Nuggets']), 3)
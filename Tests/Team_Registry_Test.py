@@ -0,0 +1,50 @@
+import unittest
+
+import pandas as pd
+
+from src.Utils.Dictionaries import team_index_current
+from src.Utils.Team_Registry import franchises, get_team_id, get_team_ids, get_team_name
+from src.Utils.tools import games_with_team_stats
+
+
+class TestTeamRegistry(unittest.TestCase):
+
+    def test_thirty_franchises(self):
+        self.assertEqual(len(franchises), 30)
+
+    def test_current_names_resolve(self):
+        for name in team_index_current:
+            self.assertIsNotNone(get_team_id(name), name)
+
+    def test_former_names_share_franchise_id(self):
+        self.assertEqual(get_team_id('New Jersey Nets'), get_team_id('Brooklyn Nets'))
+        self.assertEqual(get_team_id('Seattle SuperSonics'), get_team_id('Oklahoma City Thunder'))
+        self.assertEqual(get_team_id('New Orleans Hornets'), get_team_id('New Orleans Pelicans'))
+        self.assertEqual(get_team_id('Charlotte Bobcats'), get_team_id('Charlotte Hornets'))
+        self.assertEqual(get_team_id('LA Clippers'), get_team_id('Los Angeles Clippers'))
+        self.assertEqual(get_team_id('BOS'), 1610612738)
+
+    def test_unknown_name(self):
+        self.assertIsNone(get_team_id('Vancouver Grizzlies'))
+
+    def test_team_ids_vectorized(self):
+        ids = get_team_ids(pd.Series(['Boston Celtics', 'Unknown', 'New Jersey Nets']))
+        self.assertEqual(ids[0], 1610612738)
+        self.assertTrue(pd.isna(ids[1]))
+        self.assertEqual(ids[2], 1610612751)
+
+    def test_name_by_season(self):
+        self.assertEqual(get_team_name(1610612751, '2011-12'), 'New Jersey Nets')
+        self.assertEqual(get_team_name(1610612751, '2012-13'), 'Brooklyn Nets')
+        self.assertEqual(get_team_name(1610612760, '2007-08'), 'Seattle SuperSonics')
+        self.assertEqual(get_team_name(1610612766), 'Charlotte Hornets')
+
+    def test_games_without_team_stats_left_out(self):
+        df = pd.DataFrame({'TEAM_ID': [get_team_id('Boston Celtics'), get_team_id('Miami Heat'),
+                                       get_team_id('Utah Jazz')]})
+        games = [['Boston Celtics', 'Miami Heat'], ['Utah Jazz', 'Denver Nuggets'], ['Miami Heat', 'Unknown']]
+        self.assertEqual(games_with_team_stats(games, df), [['Boston Celtics', 'Miami Heat']])
+
+    def test_no_team_stats(self):
+        with self.assertRaises(ValueError):
+            games_with_team_stats([['Boston Celtics', 'Miami Heat']], pd.DataFrame(data={}))
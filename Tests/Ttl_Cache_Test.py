@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+
+from src.Utils.Ttl_Cache import TtlCache
+
+
+class TestTtlCache(unittest.TestCase):
+
+    def test_concurrent_misses_compute_once(self):
+        cache = TtlCache(ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'predictions'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('index', compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['predictions'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_value_served_while_refreshing(self):
+        cache = TtlCache(ttl=0.05)
+        cache.get('index', lambda: 'old')
+        time.sleep(0.1)
+        refreshed = threading.Event()
+
+        def slow_compute():
+            time.sleep(0.2)
+            refreshed.set()
+            return 'new'
+
+        start = time.perf_counter()
+        self.assertEqual(cache.get('index', slow_compute), 'old')
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertTrue(refreshed.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(cache.get('index', slow_compute), 'new')
+
+    def test_miss_joins_running_refresh(self):
+        cache = TtlCache(ttl=0.05, max_stale=0.2)
+        cache.get('index', lambda: 'old')
+        time.sleep(0.1)
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            time.sleep(0.4)
+            return 'new'
+
+        self.assertEqual(cache.get('index', slow_compute), 'old')
+        time.sleep(0.15)
+        # too stale to serve, so this waits, on the refresh that is already running
+        self.assertEqual(cache.get('index', slow_compute), 'new')
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_refresh_keeps_stale_value(self):
+        cache = TtlCache(ttl=0)
+        cache.get('index', lambda: 'old')
+        failed = threading.Event()
+
+        def fail():
+            failed.set()
+            raise ValueError('upstream down')
+
+        self.assertEqual(cache.get('index', fail), 'old')
+        self.assertTrue(failed.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(cache.get('index', lambda: 'new'), 'old')
+
+    def test_too_stale_value_recomputed(self):
+        cache = TtlCache(ttl=0, max_stale=0)
+        cache.get('index', lambda: 'old')
+        self.assertEqual(cache.get('index', lambda: 'new'), 'new')
+
+    def test_miss_error_is_raised_and_not_cached(self):
+        cache = TtlCache(ttl=60)
+        with self.assertRaises(ValueError):
+            cache.get('index', lambda: int('x'))
+        self.assertEqual(cache.get('index', lambda: 1), 1)
+
+    def test_bounded(self):
+        cache = TtlCache(ttl=60, max_entries=2)
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get(key, lambda: key)
+        self.assertEqual(cache.get('a', lambda: 'recomputed'), 'a')
+        self.assertEqual(cache.get('b', lambda: 'recomputed'), 'recomputed')
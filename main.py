@@ -1,94 +1,103 @@
+import time
+
+start_time = time.perf_counter()
+
 import argparse
-from datetime import datetime, timedelta
+from contextlib import contextmanager
 
-import pandas as pd
-import tensorflow as tf
 from colorama import Fore, Style
 
 from src.DataProviders.SbrOddsProvider import SbrOddsProvider
-from src.Predict import NN_Runner, XGBoost_Runner
-from src.Utils.Dictionaries import team_index_current
-from src.Utils.tools import create_todays_games_from_odds, get_json_data, to_data_frame, get_todays_games_json, create_todays_games
-
-todays_games_url = 'https://data.nba.com/data/10s/v2015/json/mobile_teams/nba/2024/scores/00_todays_scores.json'
-data_url = 'https://stats.nba.com/stats/leaguedashteamstats?' \
-           'Conference=&DateFrom=&DateTo=&Division=&GameScope=&' \
-           'GameSegment=&LastNGames=0&LeagueID=00&Location=&' \
-           'MeasureType=Base&Month=0&OpponentTeamID=0&Outcome=&' \
-           'PORound=0&PaceAdjust=N&PerMode=PerGame&Period=0&' \
-           'PlayerExperience=&PlayerPosition=&PlusMinus=N&Rank=N&' \
-           'Season=2024-25&SeasonSegment=&SeasonType=Regular+Season&ShotClockRange=&' \
-           'StarterBench=&TeamID=0&TwoWay=0&VsConference=&VsDivision='
-
-
-def createTodaysGames(games, df, odds):
-    match_data = []
-    todays_games_uo = []
-    home_team_odds = []
-    away_team_odds = []
-
-    home_team_days_rest = []
-    away_team_days_rest = []
-
-    for game in games:
-        home_team = game[0]
-        away_team = game[1]
-        if home_team not in team_index_current or away_team not in team_index_current:
-            continue
-        if odds is not None:
-            game_odds = odds[home_team + ':' + away_team]
-            todays_games_uo.append(game_odds['under_over_odds'])
-
-            home_team_odds.append(game_odds[home_team]['money_line_odds'])
-            away_team_odds.append(game_odds[away_team]['money_line_odds'])
+from src.Predict.Model_Registry import get_model_registry
+from src.Predict.Prediction_Service import get_runner
+from src.Utils.Concurrent_Fetch import FanOut, SourceTimeout
+from src.Utils.Http_Client import get_http_client
+from src.Utils.Schedule_Index import get_schedule_index
+from src.Utils.tools import create_todays_games_from_odds, get_json_data, to_data_frame, get_todays_games_json, create_todays_games, \
+    create_todays_games_data, data_url, games_with_team_stats, normalize, team_stats_ttl, todays_games_ttl, todays_games_url
 
-        else:
-            todays_games_uo.append(input(home_team + ' vs ' + away_team + ': '))
-
-            home_team_odds.append(input(home_team + ' odds: '))
-            away_team_odds.append(input(away_team + ' odds: '))
-
-        # calculate days rest for both teams
-        schedule_df = pd.read_csv('Data/nba-2024-UTC.csv', parse_dates=['Date'], date_format='%d/%m/%Y %H:%M')
-        home_games = schedule_df[(schedule_df['Home Team'] == home_team) | (schedule_df['Away Team'] == home_team)]
-        away_games = schedule_df[(schedule_df['Home Team'] == away_team) | (schedule_df['Away Team'] == away_team)]
-        previous_home_games = home_games.loc[schedule_df['Date'] <= datetime.today()].sort_values('Date',ascending=False).head(1)['Date']
-        previous_away_games = away_games.loc[schedule_df['Date'] <= datetime.today()].sort_values('Date',ascending=False).head(1)['Date']
-        if len(previous_home_games) > 0:
-            last_home_date = previous_home_games.iloc[0]
-            home_days_off = timedelta(days=1) + datetime.today() - last_home_date
-        else:
-            home_days_off = timedelta(days=7)
-        if len(previous_away_games) > 0:
-            last_away_date = previous_away_games.iloc[0]
-            away_days_off = timedelta(days=1) + datetime.today() - last_away_date
-        else:
-            away_days_off = timedelta(days=7)
-        # print(f"{away_team} days off: {away_days_off.days} @ {home_team} days off: {home_days_off.days}")
+# TensorFlow, Keras, XGBoost and the models are only imported and loaded once the selected model needs them
+startup_timings = [('imports', time.perf_counter() - start_time)]
+
+# seconds each source may take, retries included, the sources are fetched at the same time so the slowest one
+# bounds the wait
+fetch_timeouts = {
+    'odds': 30,
+    'todays games': 15,
+    'team stats': 30,
+    'schedule': 15,
+}
+
+
+@contextmanager
+def timed(name):
+    start = time.perf_counter()
+    yield
+    startup_timings.append((name, time.perf_counter() - start))
 
-        home_team_days_rest.append(home_days_off.days)
-        away_team_days_rest.append(away_days_off.days)
-        home_team_series = df.iloc[team_index_current.get(home_team)]
-        away_team_series = df.iloc[team_index_current.get(away_team)]
-        stats = pd.concat([home_team_series, away_team_series])
-        stats['Days-Rest-Home'] = home_days_off.days
-        stats['Days-Rest-Away'] = away_days_off.days
-        match_data.append(stats)
 
-    games_data_frame = pd.concat(match_data, ignore_index=True, axis=1)
-    games_data_frame = games_data_frame.T
+def print_startup_report():
+    print("--------------------Startup Report---------------------")
+    for name, seconds in startup_timings:
+        print(f"{name}: {seconds * 1000:.1f} ms")
+    for model_id, seconds in get_model_registry().load_times.items():
+        print(f"  of which loading {model_id}: {seconds * 1000:.1f} ms")
+    for host, stats in get_http_client().stats().items():
+        print(f"{host}: {stats['requests']} requests, {stats['cache_hits']} cache hits, {stats['errors']} errors, "
+              f"{stats['mean_latency_ms']:.0f} ms mean latency, circuit {stats['circuit']}")
+    print(f"total: {(time.perf_counter() - start_time) * 1000:.1f} ms")
+    print("Run with python -X importtime main.py for a per-module import breakdown")
+    print("-------------------------------------------------------")
 
-    frame_ml = games_data_frame.drop(columns=['TEAM_ID', 'TEAM_NAME'])
-    data = frame_ml.values
-    data = data.astype(float)
 
-    return data, todays_games_uo, frame_ml, home_team_odds, away_team_odds
+def print_nn_timing(data, todays_games_uo, frame_ml):
+    timings = get_runner("nn").time_inference(data, todays_games_uo, frame_ml)
+    print("-----------------NN Inference Timing-------------------")
+    print(f"Per-game predict loop: {timings['loop'] * 1000:.1f} ms")
+    print(f"Batched forward pass: {timings['batched'] * 1000:.1f} ms")
+    print(f"Speedup: {timings['speedup']:.1f}x")
+    print("-------------------------------------------------------")
+
+
+def fetch_odds(sportsbook):
+    return SbrOddsProvider(sportsbook=sportsbook).get_odds()
+
+
+def fetch_todays_games():
+    return create_todays_games(get_todays_games_json(todays_games_url, cache_ttl=todays_games_ttl,
+                                                     budget=fetch_timeouts['todays games']))
+
+
+def fetch_team_stats():
+    return to_data_frame(get_json_data(data_url, cache_ttl=team_stats_ttl, budget=fetch_timeouts['team stats']))
 
 
 def main():
+    get_http_client().offline = args.offline
+    fetches = FanOut()
+    if args.odds:
+        # sbrscrape takes no timeout, a stalled scrape is abandoned on its daemon thread
+        fetches.submit('odds', fetch_odds, args.odds, timeout=fetch_timeouts['odds'])
+    else:
+        fetches.submit('todays games', fetch_todays_games, timeout=fetch_timeouts['todays games'])
+    fetches.submit('team stats', fetch_team_stats, timeout=fetch_timeouts['team stats'])
+    # the schedule CSVs are only needed for days rest, load them while the network requests are in flight
+    fetches.submit('schedule', get_schedule_index, timeout=fetch_timeouts['schedule'])
+    try:
+        predict(fetches)
+    except SourceTimeout as e:
+        print(Fore.RED, f"{e}, no predictions made.")
+        print(Style.RESET_ALL)
+    startup_timings.extend((f"fetch {name} (concurrent)", seconds) for name, seconds in fetches.timings.items())
+    if args.startup_report:
+        print_startup_report()
+
+
+def predict(fetches):
     odds = None
     if args.odds:
-        odds = SbrOddsProvider(sportsbook=args.odds).get_odds()
+        with timed("wait for odds"):
+            odds = fetches.result('odds')
         games = create_todays_games_from_odds(odds)
         if len(games) == 0:
             print("No games found.")
@@ -104,28 +113,47 @@ def main():
                 home_team, away_team = g.split(":")
                 print(f"{away_team} ({odds[g][away_team]['money_line_odds']}) @ {home_team} ({odds[g][home_team]['money_line_odds']})")
     else:
-        data = get_todays_games_json(todays_games_url)
-        games = create_todays_games(data)
-    data = get_json_data(data_url)
-    df = to_data_frame(data)
-    data, todays_games_uo, frame_ml, home_team_odds, away_team_odds = createTodaysGames(games, df, odds)
+        with timed("wait for todays games"):
+            games = fetches.result('todays games')
+    with timed("wait for team stats"):
+        df = fetches.result('team stats')
+        fetches.result('schedule')
+    try:
+        games = games_with_team_stats(games, df)
+    except ValueError as e:
+        print(Fore.RED, f"{e}.")
+        print(Style.RESET_ALL)
+        return
+    if len(games) == 0:
+        print("No games with team stats found.")
+        return
+    with timed("features"):
+        data, todays_games_uo, frame_ml, home_team_odds, away_team_odds = create_todays_games_data(games, df, odds)
     if args.nn:
-        print("------------Neural Network Model Predictions-----------")
-        data = tf.keras.utils.normalize(data, axis=1)
-        NN_Runner.nn_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
-        print("-------------------------------------------------------")
+        with timed("neural network"):
+            print("------------Neural Network Model Predictions-----------")
+            data = normalize(data, axis=1)
+            get_runner("nn").nn_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
+            print("-------------------------------------------------------")
+        if args.timing:
+            print_nn_timing(data, todays_games_uo, frame_ml)
     if args.xgb:
-        print("---------------XGBoost Model Predictions---------------")
-        XGBoost_Runner.xgb_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
-        print("-------------------------------------------------------")
+        with timed("xgboost"):
+            print("---------------XGBoost Model Predictions---------------")
+            get_runner("xgb").xgb_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
+            print("-------------------------------------------------------")
     if args.A:
-        print("---------------XGBoost Model Predictions---------------")
-        XGBoost_Runner.xgb_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
-        print("-------------------------------------------------------")
-        data = tf.keras.utils.normalize(data, axis=1)
-        print("------------Neural Network Model Predictions-----------")
-        NN_Runner.nn_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
-        print("-------------------------------------------------------")
+        with timed("xgboost"):
+            print("---------------XGBoost Model Predictions---------------")
+            get_runner("xgb").xgb_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
+            print("-------------------------------------------------------")
+        with timed("neural network"):
+            data = normalize(data, axis=1)
+            print("------------Neural Network Model Predictions-----------")
+            get_runner("nn").nn_runner(data, todays_games_uo, frame_ml, games, home_team_odds, away_team_odds, args.kc)
+            print("-------------------------------------------------------")
+        if args.timing:
+            print_nn_timing(data, todays_games_uo, frame_ml)
 
 
 if __name__ == "__main__":
@@ -135,5 +163,9 @@ if __name__ == "__main__":
     parser.add_argument('-A', action='store_true', help='Run all Models')
     parser.add_argument('-odds', help='Sportsbook to fetch from. (fanduel, draftkings, betmgm, pointsbet, caesars, wynn, bet_rivers_ny')
     parser.add_argument('-kc', action='store_true', help='Calculates percentage of bankroll to bet based on model edge')
+    parser.add_argument('-timing', action='store_true', help='Report NN inference time of the batched pass against the per-game loop')
+    parser.add_argument('-offline', action='store_true',
+                        help='Use the last cached team stats and schedule instead of the network (odds still need it)')
+    parser.add_argument('-startup_report', action='store_true', help='Report time spent on imports, data fetches and model loads')
     args = parser.parse_args()
     main()
@@ -1,5 +1,26 @@
+import threading
+import time
+
 from sbrscrape import Scoreboard
 
+_snapshot_lock = threading.Lock()
+_snapshot = {'games': None, 'time': 0}
+
+
+def get_scoreboard_games(ttl=60):
+    """Return today's NBA scoreboard games, scraping sbr at most once every `ttl` seconds.
+
+    The snapshot is shared by every caller in the process, and every game already carries the lines of all books,
+    so looking up several sportsbooks only costs a single scrape. An empty scrape is not kept, sbrscrape also
+    returns no games when the scrape fails, so the next caller tries again.
+    """
+    with _snapshot_lock:
+        if not _snapshot['games'] or time.time() - _snapshot['time'] > ttl:
+            sb = Scoreboard(sport="NBA")
+            _snapshot['games'] = sb.games if hasattr(sb, 'games') else []
+            _snapshot['time'] = time.time()
+        return _snapshot['games']
+
 
 class SbrOddsProvider:
     """ Abbreviations dictionary for team location which are sometimes saved with abbrev instead of full name.
@@ -8,9 +29,12 @@ class SbrOddsProvider:
         string: Full location name
     """
 
-    def __init__(self, sportsbook="fanduel"):
-        sb = Scoreboard(sport="NBA")
-        self.games = sb.games if hasattr(sb, 'games') else []
+    def __init__(self, sportsbook="fanduel", snapshot_ttl=None):
+        if snapshot_ttl is None:
+            sb = Scoreboard(sport="NBA")
+            self.games = sb.games if hasattr(sb, 'games') else []
+        else:
+            self.games = get_scoreboard_games(ttl=snapshot_ttl)
         self.sportsbook = sportsbook
 
     def get_odds(self):
@@ -19,6 +43,30 @@ class SbrOddsProvider:
         Returns:
             dictionary: [home_team_name + ':' + away_team_name: { home_team: money_line_odds, away_team: money_line_odds }, under_over_odds: val]
         """
+        return self._get_book_odds(self.sportsbook)
+
+    def get_sportsbooks(self):
+        """Function returning every sportsbook quoting at least one line in the scraped games"""
+        sportsbooks = set()
+        for game in self.games:
+            for market in ('home_ml', 'away_ml', 'total'):
+                sportsbooks.update(game.get(market) or {})
+        return sorted(sportsbooks)
+
+    def get_all_odds(self, sportsbooks=None):
+        """Function returning the odds of several sportsbooks from the same scoreboard snapshot
+
+        Args:
+            sportsbooks: Sportsbooks to return, every book in the snapshot when None
+
+        Returns:
+            dictionary: [sportsbook: odds dictionary in the get_odds format]
+        """
+        if sportsbooks is None:
+            sportsbooks = self.get_sportsbooks()
+        return {sportsbook: self._get_book_odds(sportsbook) for sportsbook in sportsbooks}
+
+    def _get_book_odds(self, sportsbook):
         dict_res = {}
         for game in self.games:
             # Get team names
@@ -28,14 +76,14 @@ class SbrOddsProvider:
             money_line_home_value = money_line_away_value = totals_value = None
 
             # Get money line bet values
-            if self.sportsbook in game['home_ml']:
-                money_line_home_value = game['home_ml'][self.sportsbook]
-            if self.sportsbook in game['away_ml']:
-                money_line_away_value = game['away_ml'][self.sportsbook]
+            if sportsbook in game['home_ml']:
+                money_line_home_value = game['home_ml'][sportsbook]
+            if sportsbook in game['away_ml']:
+                money_line_away_value = game['away_ml'][sportsbook]
 
             # Get totals bet value
-            if self.sportsbook in game['total']:
-                totals_value = game['total'][self.sportsbook]
+            if sportsbook in game['total']:
+                totals_value = game['total'][sportsbook]
 
             dict_res[home_team_name + ':' + away_team_name] = {
                 'under_over_odds': totals_value,
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import time
+
+from src.Utils.tools import BASE_DIR
+
+models_dir = os.path.join(BASE_DIR, 'Models')
+manifest_file = os.path.join(models_dir, 'models.json')
+
+
+class ModelRegistry:
+    """Models listed in Models/models.json, loaded on first use and cached for the life of the process
+
+    The manifest records every model's id, type (xgboost or keras), market (ml or ou), path, feature schema and
+    metrics, and which model is active for each model family and market.
+    """
+
+    def __init__(self, manifest_path=manifest_file):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.base_dir = os.path.dirname(manifest_path)
+        self.active = manifest['active']
+        self.models = {entry['id']: entry for entry in manifest['models']}
+        self._loaded = {}
+        self._lock = threading.Lock()
+        # seconds spent loading each model, including the import of its library on first use
+        self.load_times = {}
+
+    def active_id(self, family, market):
+        """Id of the active `family` ('xgb' or 'nn') model for `market` ('ml' or 'ou')"""
+        try:
+            return self.active[family][market]
+        except KeyError:
+            raise KeyError(f"No active {family} model for market {market} in the model manifest") from None
+
+    def get(self, family, market):
+        """Active model of a family and market, loading it on first use"""
+        return self.load(self.active_id(family, market))
+
+    def available(self, family, market):
+        """Whether the active model of a family and market has a file on disk to load"""
+        entry = self.models[self.active_id(family, market)]
+        return os.path.exists(os.path.join(self.base_dir, entry['path']))
+
+    def load(self, model_id):
+        with self._lock:
+            if model_id not in self._loaded:
+                start = time.perf_counter()
+                self._loaded[model_id] = self._load(self.models[model_id])
+                self.load_times[model_id] = time.perf_counter() - start
+            return self._loaded[model_id]
+
+    def _load(self, entry):
+        path = os.path.join(self.base_dir, entry['path'])
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model {entry['id']} is missing at {path}, train it or activate another "
+                                    f"{entry['market']} model in the model manifest")
+        expected_features = entry.get('features', {}).get('count')
+        if entry['type'] == 'xgboost':
+            import xgboost as xgb
+            model = xgb.Booster()
+            model.load_model(path)
+            n_features = model.num_features()
+        elif entry['type'] == 'keras':
+            from keras.models import load_model
+            model = load_model(path)
+            n_features = model.input_shape[-1]
+        else:
+            raise ValueError(f"Unknown model type {entry['type']} of model {entry['id']}")
+        if expected_features is not None and n_features != expected_features:
+            raise ValueError(f"Model {entry['id']} takes {n_features} features, the manifest says {expected_features}")
+        return model
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process wide model registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def get_model(family, market):
+    return get_model_registry().get(family, market)
+
+
+def has_model(family, market):
+    return get_model_registry().available(family, market)
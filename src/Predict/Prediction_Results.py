@@ -0,0 +1,87 @@
+import numpy as np
+
+from src.Utils import Expected_Value
+from src.Utils import Kelly_Criterion as kc
+
+
+def build_results(ml_predictions_array, ou_predictions_array, games, todays_games_uo, home_team_odds, away_team_odds, kelly_criterion):
+    """
+    Turn the model probabilities of a slate into the prediction data used by the UI and the Flask app
+
+    Args:
+        ml_predictions_array: Money line class probabilities, one row per game
+        ou_predictions_array: Over/under class probabilities, one row per game, None when there is no O/U model
+        games: List of games ([home_team, away_team])
+        todays_games_uo: Over/under values for today's games
+        home_team_odds: Money line odds for home teams
+        away_team_odds: Money line odds for away teams
+        kelly_criterion: Boolean to enable Kelly Criterion calculations
+
+    Returns:
+        Dictionary with the predictions and expected values of each game
+    """
+    predictions = []
+    expected_values = []
+
+    count = 0
+    for game in games:
+        home_team = game[0]
+        away_team = game[1]
+        winner = int(np.argmax(ml_predictions_array[count]))
+        winner_confidence = ml_predictions_array[count]
+
+        if winner == 1:
+            winner_team = home_team
+            winner_confidence = round(winner_confidence[1] * 100, 1)
+        else:
+            winner_team = away_team
+            winner_confidence = round(winner_confidence[0] * 100, 1)
+
+        if ou_predictions_array is None:
+            # money line only, no O/U model to pick a side
+            ou_pick = un_confidence = None
+        elif int(np.argmax(ou_predictions_array[count])) == 0:
+            ou_pick = "UNDER"
+            un_confidence = round(ou_predictions_array[count][0] * 100, 1)
+        else:
+            ou_pick = "OVER"
+            un_confidence = round(ou_predictions_array[count][1] * 100, 1)
+
+        # Add prediction info
+        predictions.append({
+            'home_team': home_team,
+            'away_team': away_team,
+            'winner': winner_team,
+            'winner_confidence': winner_confidence,
+            'ou_pick': ou_pick,
+            'ou_confidence': un_confidence,
+            'ou_value': todays_games_uo[count] if count < len(todays_games_uo) else 0
+        })
+
+        # Calculate expected values
+        ev_home = ev_away = 0
+        if count < len(home_team_odds) and count < len(away_team_odds) and home_team_odds[count] and away_team_odds[count]:
+            ev_home = float(Expected_Value.expected_value(ml_predictions_array[count][1], int(home_team_odds[count])))
+            ev_away = float(Expected_Value.expected_value(ml_predictions_array[count][0], int(away_team_odds[count])))
+
+        # Add Kelly Criterion if enabled
+        home_kelly = away_kelly = 0
+        if kelly_criterion:
+            home_kelly = kc.calculate_kelly_criterion(home_team_odds[count], ml_predictions_array[count][1]) if count < len(home_team_odds) and home_team_odds[count] else 0
+            away_kelly = kc.calculate_kelly_criterion(away_team_odds[count], ml_predictions_array[count][0]) if count < len(away_team_odds) and away_team_odds[count] else 0
+
+        expected_values.append({
+            'home_team': home_team,
+            'away_team': away_team,
+            'home_ev': ev_home,
+            'away_ev': ev_away,
+            'home_kelly': home_kelly,
+            'away_kelly': away_kelly
+        })
+
+        count += 1
+
+    return {
+        'predictions': predictions,
+        'expected_values': expected_values
+    }
@@ -0,0 +1,123 @@
+import threading
+
+from src.DataProviders.SbrOddsProvider import SbrOddsProvider
+from src.Predict.Prediction_Results import build_results
+from src.Utils.Concurrent_Fetch import FanOut
+from src.Utils.Schedule_Index import get_schedule_index
+from src.Utils.tools import create_todays_games_from_odds, create_todays_games_data, data_url, games_with_team_stats, \
+    get_game_lines, get_json_data, normalize, team_stats_ttl, to_data_frame
+
+
+def get_runner(model):
+    """Runner module of the 'xgb' or 'nn' model, imported on first use so only that model's libraries load"""
+    if model == "nn":
+        from src.Predict import NN_Runner
+        return NN_Runner
+    from src.Predict import XGBoost_Runner
+    return XGBoost_Runner
+
+
+class PredictionService:
+    """Long-lived prediction service that keeps the models warm between requests.
+
+    Used in-process by the Flask app instead of spawning `python main.py` for every sportsbook, so the
+    Python start, TensorFlow import and model loads are paid once per process instead of once per page.
+    League team stats come from the on-disk response cache, which also keeps the last good snapshot.
+    """
+
+    def __init__(self, model="xgb", odds_ttl=60, team_stats_timeout=30, odds_timeout=30):
+        self.model = model
+        self.odds_ttl = odds_ttl
+        self.team_stats_timeout = team_stats_timeout
+        self.odds_timeout = odds_timeout
+
+    def get_team_stats(self):
+        """Return the league team stats DataFrame, downloaded at most once every `team_stats_ttl` seconds"""
+        return to_data_frame(get_json_data(data_url, cache_ttl=team_stats_ttl, budget=self.team_stats_timeout))
+
+    def predict(self, sportsbook="fanduel", kelly_criterion=False):
+        """Run today's predictions against the odds of one sportsbook
+
+        Returns:
+            list: one dictionary per game with the teams, odds, model confidence, O/U pick and EV of both sides
+        """
+        return self.predict_all([sportsbook], kelly_criterion)[sportsbook]
+
+    def predict_all(self, sportsbooks, kelly_criterion=False):
+        """Run today's predictions against the odds of several sportsbooks
+
+        The money line model only sees team stats and days rest, so the feature matrix is built and the ML model
+        runs once per slate. Only the O/U model and the EV/Kelly step run per book, with that book's lines.
+        The odds, league team stats and schedule are fetched at the same time, each with its own timeout.
+
+        Returns:
+            dictionary: [sportsbook: list of game dictionaries in the predict format]
+        """
+        fetches = FanOut()
+        fetches.submit('odds', self._get_all_odds, sportsbooks, timeout=self.odds_timeout)
+        fetches.submit('team stats', self.get_team_stats, timeout=self.team_stats_timeout)
+        fetches.submit('schedule', get_schedule_index)
+        all_odds = fetches.result('odds')
+        # every book is read from the same scoreboard snapshot, so they all list the same games
+        games = create_todays_games_from_odds(all_odds[sportsbooks[0]])
+        if len(games) == 0:
+            return {sportsbook: [] for sportsbook in sportsbooks}
+        team_stats = fetches.result('team stats')
+        fetches.result('schedule')
+        # the lines, predictions and results below are all indexed by this list of games
+        games = games_with_team_stats(games, team_stats)
+        if len(games) == 0:
+            return {sportsbook: [] for sportsbook in sportsbooks}
+
+        data, _, frame_ml, _, _ = create_todays_games_data(games, team_stats, all_odds[sportsbooks[0]])
+        runner = get_runner(self.model)
+        if self.model == "nn":
+            data = normalize(data, axis=1)
+        ml_predictions_array = runner.predict_ml(data)
+
+        results = {}
+        for sportsbook in sportsbooks:
+            todays_games_uo, home_team_odds, away_team_odds = get_game_lines(games, all_odds[sportsbook])
+            ou_predictions_array = runner.predict_ou(frame_ml, todays_games_uo)
+            book_results = build_results(ml_predictions_array, ou_predictions_array, games, todays_games_uo,
+                                         home_team_odds, away_team_odds, kelly_criterion)
+            results[sportsbook] = self._to_games(book_results, home_team_odds, away_team_odds)
+        return results
+
+    def _get_all_odds(self, sportsbooks):
+        return SbrOddsProvider(snapshot_ttl=self.odds_ttl).get_all_odds(sportsbooks)
+
+    @staticmethod
+    def _to_games(results, home_team_odds, away_team_odds):
+        games = []
+        for i, (prediction, expected_value) in enumerate(zip(results['predictions'], results['expected_values'])):
+            home_team = prediction['home_team']
+            home_wins = prediction['winner'] == home_team
+            games.append({
+                'home_team': home_team,
+                'away_team': prediction['away_team'],
+                'home_confidence': prediction['winner_confidence'] if home_wins else None,
+                'away_confidence': None if home_wins else prediction['winner_confidence'],
+                'ou_pick': prediction['ou_pick'],
+                'ou_value': prediction['ou_value'],
+                'ou_confidence': prediction['ou_confidence'],
+                'home_team_odds': home_team_odds[i],
+                'away_team_odds': away_team_odds[i],
+                'home_team_ev': expected_value['home_ev'],
+                'away_team_ev': expected_value['away_ev'],
+                'home_kelly': expected_value['home_kelly'],
+                'away_kelly': expected_value['away_kelly']
+            })
+        return games
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_prediction_service(model="xgb"):
+    """Return the process-wide PredictionService for `model`, creating it on first use"""
+    with _services_lock:
+        if model not in _services:
+            _services[model] = PredictionService(model=model)
+        return _services[model]
@@ -1,45 +1,59 @@
-import re
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from datetime import datetime, timedelta
+
+odds_db = "../../Data/OddsData.sqlite"
+datasets = ["odds_2022-23", "odds_2021-22", "odds_2020-21", "odds_2019-20", "odds_2018-19", "odds_2017-18", "odds_2016-17", "odds_2015-16", "odds_2014-15", "odds_2013-14", "odds_2012-13", "odds_2011-12", "odds_2010-11", "odds_2009-10", "odds_2008-09", "odds_2007-08"]
 
 
-def get_date(date_string):
-    year1,month,day = re.search(r'(\d+)-\d+-(\d\d)(\d\d)', date_string).groups()
-    year = year1 if int(month) > 8 else int(year1) + 1
-    return datetime.strptime(f"{year}-{month}-{day}", '%Y-%m-%d')
+def get_dates(date_strings):
+    """Vectorized get_date, months before September belong to the second year of the season"""
+    parts = date_strings.str.extract(r'(\d+)-\d+-(\d\d)(\d\d)').astype(int)
+    year = parts[0] + (parts[1] <= 8)
+    return pd.to_datetime(pd.DataFrame({'year': year, 'month': parts[1], 'day': parts[2]}))
 
-con = sqlite3.connect("../../Data/OddsData.sqlite")
-datasets = ["odds_2022-23", "odds_2021-22", "odds_2020-21", "odds_2019-20", "odds_2018-19", "odds_2017-18", "odds_2016-17", "odds_2015-16", "odds_2014-15", "odds_2013-14", "odds_2012-13", "odds_2011-12", "odds_2010-11", "odds_2009-10", "odds_2008-09", "odds_2007-08"]
-for dataset in tqdm(datasets):
+
+def add_days_rest(data):
+    """Set Days_Rest_Home and Days_Rest_Away for every game of one season
+
+    Home and away appearances are melted into one sequence per team in table order, so each team's days rest is
+    the gap to its previous appearance: 10 on its first game of the season, 9 when the gap is not between 1 and 8.
+    """
+    if 'Home' not in data or 'Away' not in data:
+        return data
+    dates = get_dates(data['Date']).values
+    n_games = len(data.index)
+
+    # home appearance of game i sits at 2 * i and its away appearance at 2 * i + 1, which keeps table order
+    teams = np.empty(2 * n_games, dtype=object)
+    teams[0::2] = data['Home'].values
+    teams[1::2] = data['Away'].values
+    appearances = pd.DataFrame({'Team': teams, 'Date': np.repeat(dates, 2)})
+
+    days = appearances.groupby('Team', sort=False)['Date'].diff().dt.days
+    days_rest = np.where(days.isna(), 10, np.where((days > 0) & (days < 9), days, 9)).astype(float)
+
+    data['Days_Rest_Home'] = days_rest[0::2]
+    data['Days_Rest_Away'] = days_rest[1::2]
+    return data
+
+
+def process_dataset(dataset):
+    con = sqlite3.connect(odds_db)
     data = pd.read_sql_query(f"select * from \"{dataset}\"", con, index_col="index")
-    teams_last_played = {}
-    for index, row in data.iterrows():
-        if 'Home' not in row or 'Away' not in row:
-            continue
-        if row['Home'] not in teams_last_played:
-            teams_last_played[row['Home']] = get_date(row['Date'])
-            home_games_rested = 10 # start of season, big number
-        else:
-            current_date = get_date(row['Date'])
-            home_games_rested = (current_date - teams_last_played[row['Home']]).days if 0 < (current_date - teams_last_played[row['Home']]).days < 9 else 9
-            teams_last_played[row['Home']] = current_date
-        if row['Away'] not in teams_last_played:
-            teams_last_played[row['Away']] = get_date(row['Date'])
-            away_games_rested = 10 # start of season, big number
-        else:
-            current_date = get_date(row['Date'])
-            away_games_rested = (current_date - teams_last_played[row['Away']]).days if 0 < (current_date - teams_last_played[row['Away']]).days < 9 else 9
-            teams_last_played[row['Away']] = current_date
-        
-        # update date
-        data.at[index,'Days_Rest_Home'] = home_games_rested
-        data.at[index,'Days_Rest_Away'] = away_games_rested
-
-        # print(f"{row['Away']} @ {row['Home']} games rested: {away_games_rested} @ {home_games_rested}")
-
-    # write data to db
-    data.to_sql(dataset, con, if_exists="replace")
-
-con.close()
+    con.close()
+    return dataset, add_days_rest(data)
+
+
+if __name__ == "__main__":
+    # seasons are independent, so they are computed in parallel and written back from this process
+    con = sqlite3.connect(odds_db)
+    with ProcessPoolExecutor() as executor:
+        for dataset, data in tqdm(executor.map(process_dataset, datasets), total=len(datasets)):
+            # write data to db
+            data.to_sql(dataset, con, if_exists="replace")
+
+    con.close()
@@ -7,95 +7,78 @@ import pandas as pd
 import toml
 
 sys.path.insert(1, os.path.join(sys.path[0], '../..'))
-from src.Utils.Dictionaries import team_index_07, team_index_08, team_index_12, team_index_13, team_index_14, \
-    team_index_current
+from src.Utils.Feature_Store import write_feature_store
+from src.Utils.Team_Registry import get_team_ids
+from src.Utils.Team_Stats_Store import read_team_stats
 
 config = toml.load("../../config.toml")
 
-df = pd.DataFrame
-scores = []
-win_margin = []
-OU = []
-OU_Cover = []
-games = []
-days_rest_away = []
-days_rest_home = []
-teams_con = sqlite3.connect("../../Data/TeamData.sqlite")
-odds_con = sqlite3.connect("../../Data/OddsData.sqlite")
 
-for key, value in config['create-games'].items():
-    print(key)
-    odds_df = pd.read_sql_query(f"select * from \"odds_{key}_new\"", odds_con, index_col="index")
-    team_table_str = key
-    year_count = 0
-    season = key
+def create_season_games(season, odds_df, team_df):
+    """Join the home and away team stats of every game in one season onto its odds rows
+
+    Team stats are matched on the game date and the franchise TEAM_ID, so a snapshot that is missing a team only
+    drops the games of that team instead of the whole day.
+    """
+    stats_columns = list(team_df.columns)
 
-    for row in odds_df.itertuples():
-        home_team = row[2]
-        away_team = row[3]
+    # money lines are kept as metadata for backtests, older odds tables may not have them
+    ml_columns = [column for column in ['ML_Home', 'ML_Away'] if column in odds_df]
+    games = odds_df[['Date', 'Home', 'Away', 'OU', 'Points', 'Win_Margin', 'Days_Rest_Home', 'Days_Rest_Away']
+                    + ml_columns]
+    games = games.assign(Home_TEAM_ID=get_team_ids(games['Home']).values,
+                         Away_TEAM_ID=get_team_ids(games['Away']).values)
+    unknown = games['Home_TEAM_ID'].isna() | games['Away_TEAM_ID'].isna()
+    if unknown.any():
+        unknown_teams = set(games.loc[games['Home_TEAM_ID'].isna(), 'Home']) | \
+                        set(games.loc[games['Away_TEAM_ID'].isna(), 'Away'])
+        print(f"Skipping {unknown.sum()} {season} games with unknown teams: {sorted(unknown_teams)}")
+        games = games[~unknown]
+    games = games.astype({'Home_TEAM_ID': 'int64', 'Away_TEAM_ID': 'int64'})
 
-        date = row[1]
+    games = games.merge(team_df.add_prefix('Home_'), left_on=['Date', 'Home_TEAM_ID'],
+                        right_on=['Home_Date', 'Home_TEAM_ID'], how='inner')
+    games = games.merge(team_df.add_prefix('Away_'), left_on=['Date', 'Away_TEAM_ID'],
+                        right_on=['Away_Date', 'Away_TEAM_ID'], how='inner')
+    missing = len(odds_df.index) - unknown.sum() - len(games.index)
+    if missing:
+        print(f"Skipping {missing} {season} games without team stats for that day")
 
-        team_df = pd.read_sql_query(f"select * from \"{date}\"", teams_con, index_col="index")
-        if len(team_df.index) == 30:
-            scores.append(row[8])
-            OU.append(row[4])
-            days_rest_home.append(row[10])
-            days_rest_away.append(row[11])
-            if row[9] > 0:
-                win_margin.append(1)
-            else:
-                win_margin.append(0)
+    frame = pd.concat([
+        games[[f"Home_{column}" for column in stats_columns]].set_axis(stats_columns, axis=1),
+        games[[f"Away_{column}" for column in stats_columns]].set_axis([f"{column}.1" for column in stats_columns], axis=1)
+    ], axis=1)
+    frame['Score'] = games['Points']
+    frame['Home-Team-Win'] = (games['Win_Margin'] > 0).astype(int)
+    frame['OU'] = games['OU']
+    frame['OU-Cover'] = np.select([games['Points'] < games['OU'], games['Points'] > games['OU']], [0, 1], 2)
+    frame['Days-Rest-Home'] = games['Days_Rest_Home']
+    frame['Days-Rest-Away'] = games['Days_Rest_Away']
+    for column in ml_columns:
+        frame[column] = games[column]
+    return frame
 
-            if row[8] < row[4]:
-                OU_Cover.append(0)
-            elif row[8] > row[4]:
-                OU_Cover.append(1)
-            elif row[8] == row[4]:
-                OU_Cover.append(2)
 
-            if season == '2007-08':
-                home_team_series = team_df.iloc[team_index_07.get(home_team)]
-                away_team_series = team_df.iloc[team_index_07.get(away_team)]
-            elif season == '2008-09' or season == "2009-10" or season == "2010-11" or season == "2011-12":
-                home_team_series = team_df.iloc[team_index_08.get(home_team)]
-                away_team_series = team_df.iloc[team_index_08.get(away_team)]
-            elif season == "2012-13":
-                home_team_series = team_df.iloc[team_index_12.get(home_team)]
-                away_team_series = team_df.iloc[team_index_12.get(away_team)]
-            elif season == '2013-14':
-                home_team_series = team_df.iloc[team_index_13.get(home_team)]
-                away_team_series = team_df.iloc[team_index_13.get(away_team)]
-            elif season == '2022-23' or season == '2023-24':
-                home_team_series = team_df.iloc[team_index_current.get(home_team)]
-                away_team_series = team_df.iloc[team_index_current.get(away_team)]
-            else:
-                try:
-                    home_team_series = team_df.iloc[team_index_14.get(home_team)]
-                    away_team_series = team_df.iloc[team_index_14.get(away_team)]
-                except Exception as e:
-                    print(home_team)
-                    raise e
-            game = pd.concat([home_team_series, away_team_series.rename(
-                index={col: f"{col}.1" for col in team_df.columns.values}
-            )])
-            games.append(game)
+teams_con = sqlite3.connect("../../Data/TeamData.sqlite")
+odds_con = sqlite3.connect("../../Data/OddsData.sqlite")
+
+season_frames = []
+for key, value in config['create-games'].items():
+    print(key)
+    odds_df = pd.read_sql_query(f"select * from \"odds_{key}_new\"", odds_con, index_col="index")
+    # one range scan for the whole season instead of a query per game
+    team_df = read_team_stats(teams_con, odds_df['Date'].min(), odds_df['Date'].max())
+    season_frames.append(create_season_games(key, odds_df, team_df))
 odds_con.close()
 teams_con.close()
-season = pd.concat(games, ignore_index=True, axis=1)
-season = season.T
-frame = season.drop(columns=['TEAM_ID', 'TEAM_ID.1'])
-frame['Score'] = np.asarray(scores)
-frame['Home-Team-Win'] = np.asarray(win_margin)
-frame['OU'] = np.asarray(OU)
-frame['OU-Cover'] = np.asarray(OU_Cover)
-frame['Days-Rest-Home'] = np.asarray(days_rest_home)
-frame['Days-Rest-Away'] = np.asarray(days_rest_away)
-# fix types
-for field in frame.columns.values:
-    if 'TEAM_' in field or 'Date' in field or field not in frame:
-        continue
-    frame[field] = frame[field].astype(float)
+
+frame = pd.concat(season_frames, ignore_index=True)
+frame = frame.drop(columns=['TEAM_ID', 'TEAM_ID.1'])
+# fix types, every stat and label is stored as float
+numeric_fields = [field for field in frame.columns.values if 'TEAM_' not in field and 'Date' not in field]
+frame[numeric_fields] = frame[numeric_fields].astype(float)
 con = sqlite3.connect("../../Data/dataset.sqlite")
 frame.to_sql("dataset_2012-24_new", con, if_exists="replace")
 con.close()
+# float32 copy the training scripts memory-map instead of parsing the table on every run
+write_feature_store(frame, "dataset_2012-24_new")
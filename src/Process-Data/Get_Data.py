@@ -1,40 +1,130 @@
+import argparse
 import os
 import random
 import sqlite3
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
 
 import toml
 
 sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Fetch_Log import FetchLog
+from src.Utils.Http_Client import HttpClient
+from src.Utils.Team_Stats_Store import stored_dates, write_team_stats
 from src.Utils.tools import get_json_data, to_data_frame
 
-config = toml.load("../../config.toml")
 
-url = config['data_url']
+class RateLimiter:
+    """Spaces out requests so all workers together stay under `rate` requests per second"""
 
-con = sqlite3.connect("../../Data/TeamData.sqlite")
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
 
-for key, value in config['get-data'].items():
-    date_pointer = datetime.strptime(value['start_date'], "%Y-%m-%d").date()
-    end_date = datetime.strptime(value['end_date'], "%Y-%m-%d").date()
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
 
-    while date_pointer <= end_date:
-        print("Getting data: ", date_pointer)
 
-        raw_data = get_json_data(
-            url.format(date_pointer.month, date_pointer.day, value['start_year'], date_pointer.year, key))
-        df = to_data_frame(raw_data)
+def fetch_team_data(url, limiter, retries, backoff, client):
+    """Download one day of team stats, retrying with jittered exponential backoff on errors and empty responses"""
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            df = to_data_frame(get_json_data(url, client=client))
+            if not df.empty:
+                return df
+        except Exception as e:
+            print(e)
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+    return None
 
-        date_pointer = date_pointer + timedelta(days=1)
 
-        df['Date'] = str(date_pointer)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Download daily team stats for the configured seasons')
+    parser.add_argument('-workers', type=int, default=4, help='Number of concurrent downloads')
+    parser.add_argument('-rate', type=float, default=1.0, help='Maximum requests per second across all workers')
+    parser.add_argument('-retries', type=int, default=3, help='Retries per date before giving up')
+    parser.add_argument('-backoff', type=float, default=2.0, help='Base backoff in seconds between retries')
+    parser.add_argument('-incremental', action='store_true', help='Only fetch dates that are missing or stale')
+    parser.add_argument('-stale_days', type=int, default=1,
+                        help='Refetch dates that were fetched less than this many days after they happened')
+    args = parser.parse_args()
 
-        df.to_sql(date_pointer.strftime("%Y-%m-%d"), con, if_exists="replace")
+    config = toml.load("../../config.toml")
 
-        time.sleep(random.randint(1, 3))
+    url = config['data_url']
 
-        # TODO: Add tests
+    con = sqlite3.connect("../../Data/TeamData.sqlite")
+    fetch_log = FetchLog(con, stale_days=args.stale_days)
+    fetched = fetch_log.fetched('team_data')
+    existing_dates = stored_dates(con)
 
-con.close()
+    jobs = []
+    skipped = 0
+    for key, value in config['get-data'].items():
+        date_pointer = datetime.strptime(value['start_date'], "%Y-%m-%d").date()
+        end_date = datetime.strptime(value['end_date'], "%Y-%m-%d").date()
+        if args.incremental:
+            end_date = min(end_date, date.today())
+
+        while date_pointer <= end_date:
+            stats_date = (date_pointer + timedelta(days=1)).strftime("%Y-%m-%d")
+            if args.incremental and stats_date in existing_dates \
+                    and not fetch_log.is_stale(date_pointer, fetched.get(date_pointer)):
+                skipped += 1
+                date_pointer = date_pointer + timedelta(days=1)
+                continue
+            jobs.append((date_pointer, url.format(date_pointer.month, date_pointer.day, value['start_year'],
+                                                  date_pointer.year, key)))
+            date_pointer = date_pointer + timedelta(days=1)
+
+    if args.incremental:
+        print(f"Skipping {skipped} dates already in TeamData.sqlite, fetching {len(jobs)}")
+
+    limiter = RateLimiter(args.rate)
+    # retries stay in fetch_team_data behind the rate limiter, and a bulk download should ride out a
+    # throttling spell with its own backoff rather than trip a circuit breaker shared by every worker
+    client = HttpClient(retries=0, failure_threshold=None, pool_size=args.workers)
+    start_time = time.monotonic()
+    done = failed = 0
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(fetch_team_data, job_url, limiter, args.retries, args.backoff, client): date_pointer
+                   for date_pointer, job_url in jobs}
+
+        # write each day as soon as it arrives, sqlite writes stay on this thread
+        for future in as_completed(futures):
+            date_pointer = futures[future]
+            df = future.result()
+            done += 1
+            if df is None:
+                failed += 1
+                print("Failed to get data: ", date_pointer)
+                continue
+
+            # stats up to date_pointer are the ones known going into the next day's games
+            table_date = date_pointer + timedelta(days=1)
+            df['Date'] = str(table_date)
+            write_team_stats(con, df)
+            fetch_log.mark('team_data', date_pointer)
+
+            elapsed = time.monotonic() - start_time
+            print(f"Got data: {date_pointer} ({done}/{len(jobs)}, {done / elapsed * 60:.1f} dates/minute)")
+
+    elapsed = max(time.monotonic() - start_time, 1e-9)
+    print(f"Downloaded {done - failed} dates, {failed} failed, in {elapsed / 60:.1f} minutes "
+          f"({done / elapsed * 60:.1f} dates/minute)")
+
+    # TODO: Add tests
+
+    con.close()
@@ -1,9 +1,10 @@
+import argparse
 import os
 import random
 import sqlite3
 import sys
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import pandas as pd
 import toml
@@ -12,27 +13,78 @@ from sbrscrape import Scoreboard
 # TODO: Add tests
 
 sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Fetch_Log import FetchLog
+
+parser = argparse.ArgumentParser(description='Download odds data for the configured seasons')
+parser.add_argument('-incremental', action='store_true', help='Resume from the first date that is missing or stale')
+parser.add_argument('-stale_days', type=int, default=1,
+                    help='Refetch dates that were fetched less than this many days after they happened')
+args = parser.parse_args()
 
 sportsbook = 'fanduel'
-df_data = []
 
 config = toml.load("config.toml")
 
 con = sqlite3.connect("Data/OddsData.sqlite")
+fetch_log = FetchLog(con, stale_days=args.stale_days)
+
+
+def table_exists(name):
+    return con.execute("select 1 from sqlite_master where type = 'table' and name = ?", (name,)).fetchone() is not None
+
+
+def resume_date(key, start_date, end_date):
+    """First date of the season that has not been fetched yet or was fetched before its results were final"""
+    fetched = fetch_log.fetched(key)
+    # tables written before the fetch log existed count as fetched up to their last date
+    last_saved = con.execute(f'select max(Date) from "{key}"').fetchone()[0]
+    last_saved = datetime.strptime(last_saved[:10], "%Y-%m-%d").date() if last_saved else None
+
+    date_pointer = start_date
+    while date_pointer <= end_date:
+        if date_pointer in fetched:
+            if fetch_log.is_stale(date_pointer, fetched[date_pointer]):
+                break
+        elif last_saved is None or date_pointer > last_saved or fetch_log.is_stale(date_pointer):
+            break
+        date_pointer = date_pointer + timedelta(days=1)
+    return date_pointer
+
 
 for key, value in config['get-odds-data'].items():
     date_pointer = datetime.strptime(value['start_date'], "%Y-%m-%d").date()
     end_date = datetime.strptime(value['end_date'], "%Y-%m-%d").date()
     teams_last_played = {}
+    row_count = 0
+
+    if args.incremental and table_exists(key):
+        end_date = min(end_date, date.today())
+        date_pointer = resume_date(key, date_pointer, end_date)
+        print(f"Resuming {key} odds data from {date_pointer}")
+
+        # drop anything from the resume date on and rebuild the days rest state from what is kept
+        con.execute(f'delete from "{key}" where Date >= ?', (str(date_pointer),))
+        con.commit()
+        saved_df = pd.read_sql_query(f'select * from "{key}"', con)
+        row_count = len(saved_df.index)
+        for team_column in ['Home', 'Away']:
+            for team, last_played in saved_df.groupby(team_column)['Date'].max().items():
+                last_played = datetime.strptime(last_played[:10], "%Y-%m-%d").date()
+                teams_last_played[team] = max(teams_last_played.get(team, last_played), last_played)
+    elif table_exists(key):
+        con.execute(f'drop table "{key}"')
+        con.commit()
 
     while date_pointer <= end_date:
         print("Getting odds data: ", date_pointer)
         sb = Scoreboard(date=date_pointer)
 
         if not hasattr(sb, "games"):
+            fetch_log.mark(key, date_pointer)
             date_pointer = date_pointer + timedelta(days=1)
             continue
 
+        df_data = []
         for game in sb.games:
             if game['home_team'] not in teams_last_played:
                 teams_last_played[game['home_team']] = date_pointer
@@ -67,9 +119,13 @@ for key, value in config['get-odds-data'].items():
             except KeyError:
                 print(f"No {sportsbook} odds data found for game: {game}")
 
+        # checkpoint every day so an interrupted run can resume where it stopped
+        if df_data:
+            df = pd.DataFrame(df_data, index=range(row_count, row_count + len(df_data)))
+            df.to_sql(key, con, if_exists="append")
+            row_count += len(df_data)
+        fetch_log.mark(key, date_pointer)
+
         date_pointer = date_pointer + timedelta(days=1)
         time.sleep(random.randint(1, 3))
-
-    df = pd.DataFrame(df_data, )
-    df.to_sql(key, con, if_exists="replace")
 con.close()
@@ -0,0 +1,43 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+import pandas as pd
+from tqdm import tqdm
+
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Team_Stats_Store import create_index, team_stats_table, write_team_stats
+
+# Moves the one-table-per-date layout of TeamData.sqlite into the single team_stats table keyed by (Date, TEAM_ID)
+
+parser = argparse.ArgumentParser(description='Migrate per-date team stats tables into the team_stats table')
+parser.add_argument('-drop', action='store_true', help='Drop the per-date tables once they are migrated')
+parser.add_argument('-batch', type=int, default=200, help='Number of per-date tables written per transaction')
+args = parser.parse_args()
+
+con = sqlite3.connect("../../Data/TeamData.sqlite")
+
+date_tables = sorted(row[0] for row in con.execute("select name from sqlite_master where type = 'table'")
+                     if re.fullmatch(r'\d{4}-\d{2}-\d{2}', row[0]))
+print(f"Migrating {len(date_tables)} per-date tables into {team_stats_table}")
+
+for start in tqdm(range(0, len(date_tables), args.batch)):
+    batch = date_tables[start:start + args.batch]
+    frames = []
+    for table in batch:
+        df = pd.read_sql_query(f'select * from "{table}"', con, index_col="index")
+        # the table name is the authoritative date, older tables may lack or disagree on the Date column
+        df['Date'] = table
+        frames.append(df)
+    write_team_stats(con, pd.concat(frames))
+    if args.drop:
+        for table in batch:
+            con.execute(f'drop table "{table}"')
+        con.commit()
+
+create_index(con)
+if args.drop:
+    con.execute("vacuum")
+con.close()
@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Backtest import WalkForwardBacktest
+from src.Utils.Feature_Store import load_feature_store
+import XGBoost_Model_ML
+import XGBoost_Model_UO
+
+dataset = "dataset_2012-24_new"
+
+targets = {
+    'ml': ('ml', 'Home-Team-Win', XGBoost_Model_ML.param, XGBoost_Model_ML.epochs),
+    'ou': ('ou', 'OU-Cover', XGBoost_Model_UO.param, XGBoost_Model_UO.epochs),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Walk-forward backtest: train on earlier seasons, score the next')
+    parser.add_argument('-target', choices=list(targets), default='ml', help='Money line or over/under model')
+    parser.add_argument('-params', default=None,
+                        help='JSON object of XGBoost params overriding the training script ones')
+    parser.add_argument('-rounds', type=int, default=None, help='Boosting rounds, defaults to the training script')
+    parser.add_argument('-min_train_seasons', type=int, default=3, help='Seasons trained on before the first fold')
+    parser.add_argument('-kelly_fraction', type=float, default=1.0, help='Fraction of the Kelly stake to bet')
+    parser.add_argument('-workers', type=int, default=None, help='Parallel folds, defaults to cores / threads')
+    parser.add_argument('-threads', type=int, default=1, help='XGBoost threads per fold')
+    parser.add_argument('-curves', default=None, help='Write the Kelly bankroll curves to this CSV')
+    args = parser.parse_args()
+
+    features, label, param, epochs = targets[args.target]
+    param = {**param, **json.loads(args.params)} if args.params else param
+
+    # builds the feature store once if Create_Games has not written it yet
+    load_feature_store(dataset, "../../Data/dataset.sqlite")
+
+    with WalkForwardBacktest(dataset, features, label, min_train_seasons=args.min_train_seasons,
+                             workers=args.workers, threads=args.threads) as backtest:
+        report, curves = backtest.run(param, args.rounds or epochs, kelly_fraction=args.kelly_fraction)
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(report.to_string(index=False))
+    if args.curves and curves:
+        pd.DataFrame({season: pd.Series(curve) for season, curve in curves.items()}).to_csv(args.curves,
+                                                                                          index_label='bet')
@@ -1,11 +1,26 @@
-import sqlite3
+import argparse
+import os
+import sys
 import time
 
-import numpy as np
-import pandas as pd
 import tensorflow as tf
 from keras.callbacks import TensorBoard, EarlyStopping, ModelCheckpoint
 
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Feature_Store import load_feature_store
+from src.Utils.NN_Pipeline import default_learning_rate, learning_rate_schedule, make_datasets
+
+parser = argparse.ArgumentParser(description='Train the over/under neural network')
+parser.add_argument('-epochs', type=int, default=50)
+parser.add_argument('-batch_size', type=int, default=32, help='Larger batches train faster per epoch')
+parser.add_argument('-lr', type=float, default=None,
+                    help='Peak learning rate, defaults to 1e-3 scaled with the square root of batch_size / 32')
+parser.add_argument('-lr_schedule', choices=['constant', 'cosine'], default='constant',
+                    help='cosine warms up for two epochs, then decays, useful with large batches')
+parser.add_argument('-xla', action='store_true', help='Compile the training step with XLA')
+parser.add_argument('-no_tensorboard', action='store_true', help='Skip writing TensorBoard logs')
+args = parser.parse_args()
+
 current_time = str(time.time())
 
 tensorboard = TensorBoard(log_dir='../../Logs/{}'.format(current_time))
@@ -13,20 +28,14 @@ earlyStopping = EarlyStopping(monitor='val_loss', patience=10, verbose=0, mode='
 mcp_save = ModelCheckpoint('../../Models/Trained-Model-OU-' + current_time, save_best_only=True, monitor='val_loss', mode='min')
 
 dataset = "dataset_2012-24_new"
-con = sqlite3.connect("../../Data/dataset.sqlite")
-data = pd.read_sql_query(f"select * from \"{dataset}\"", con, index_col="index")
-con.close()
-
-OU = data['OU-Cover']
-total = data['OU']
-data.drop(['Score', 'Home-Team-Win', 'TEAM_NAME', 'Date', 'TEAM_NAME.1', 'Date.1', 'OU-Cover', 'OU'], axis=1, inplace=True)
+store = load_feature_store(dataset, "../../Data/dataset.sqlite")
 
-data['OU'] = np.asarray(total)
-data = data.values
-data = data.astype(float)
+OU = store.label('OU-Cover')
+data = store.ou_features()
 
-x_train = tf.keras.utils.normalize(data, axis=1)
-y_train = np.asarray(OU)
+train_ds, valid_ds, steps_per_epoch = make_datasets(data, OU, args.batch_size)
+learning_rate = learning_rate_schedule(args.lr or default_learning_rate(args.batch_size), args.lr_schedule,
+                                       steps_per_epoch, args.epochs)
 
 model = tf.keras.models.Sequential()
 model.add(tf.keras.layers.Flatten())
@@ -35,7 +44,9 @@ model.add(tf.keras.layers.Flatten())
 model.add(tf.keras.layers.Dense(128, activation=tf.nn.relu6))
 model.add(tf.keras.layers.Dense(3, activation=tf.nn.softmax))
 
-model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
-model.fit(x_train, y_train, epochs=50, validation_split=0.1, batch_size=32, callbacks=[tensorboard, earlyStopping, mcp_save])
+model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss='sparse_categorical_crossentropy',
+              metrics=['accuracy'], jit_compile=args.xla)
+callbacks = [earlyStopping, mcp_save] if args.no_tensorboard else [tensorboard, earlyStopping, mcp_save]
+model.fit(train_ds, epochs=args.epochs, validation_data=valid_ds, callbacks=callbacks)
 
 print('Done')
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Feature_Store import load_feature_store
+from src.Utils.Hyperparameter_Search import successive_halving
+
+dataset = "dataset_2012-24_new"
+
+targets = {
+    'ml': ('ml', 'Home-Team-Win'),
+    'ou': ('ou', 'OU-Cover'),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Search model hyperparameters with successive halving')
+    parser.add_argument('-model', choices=['xgb', 'nn'], default='xgb')
+    parser.add_argument('-target', choices=list(targets), default='ml', help='Money line or over/under model')
+    parser.add_argument('-configs', type=int, default=27, help='Number of sampled configurations')
+    parser.add_argument('-min_resource', type=int, default=None,
+                        help='Boosting rounds or epochs of the first rung (default 25 rounds / 2 epochs)')
+    parser.add_argument('-max_resource', type=int, default=None,
+                        help='Most boosting rounds or epochs of a configuration (default 750 rounds / 50 epochs)')
+    parser.add_argument('-reduction', type=int, default=3, help='Keep 1 / reduction of the configurations per rung')
+    parser.add_argument('-workers', type=int, default=None, help='Parallel trainings, defaults to cores / threads')
+    parser.add_argument('-threads', type=int, default=1, help='Threads per training')
+    parser.add_argument('-seed', type=int, default=None, help='Seed for sampling and the validation split')
+    parser.add_argument('-study', default=None, help='Study name in Data/trials.sqlite')
+    args = parser.parse_args()
+
+    min_resource = args.min_resource or (25 if args.model == 'xgb' else 2)
+    max_resource = args.max_resource or (750 if args.model == 'xgb' else 50)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    study = args.study or f"{args.model}_{args.target}_{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    features, label = targets[args.target]
+
+    # builds the feature store once if Create_Games has not written it yet
+    load_feature_store(dataset, "../../Data/dataset.sqlite")
+
+    best = successive_halving(study, args.model, dataset, features, label, args.configs, min_resource,
+                              max_resource, reduction=args.reduction, workers=workers, threads=args.threads,
+                              seed=args.seed)
+    print(f"Best configurations of study {study}:")
+    for trial, resource, params, loss, accuracy in best:
+        print(f"  trial {trial} ({resource}): loss {loss:.4f}, {accuracy}% {params}")
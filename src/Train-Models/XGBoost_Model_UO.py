@@ -1,50 +1,37 @@
-import sqlite3
+import argparse
+import os
+import sys
 
-import numpy as np
-import pandas as pd
-import xgboost as xgb
-from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
-from tqdm import tqdm
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from src.Utils.Feature_Store import load_feature_store
+from src.Utils.Trial_Driver import run_trials
 
 dataset = "dataset_2012-24_new"
-con = sqlite3.connect("../../Data/dataset.sqlite")
-data = pd.read_sql_query(f"select * from \"{dataset}\"", con, index_col="index")
-con.close()
-OU = data['OU-Cover']
-total = data['OU']
-data.drop(['Score', 'Home-Team-Win', 'TEAM_NAME', 'Date', 'TEAM_NAME.1', 'Date.1', 'OU-Cover', 'OU'], axis=1, inplace=True)
 
-data['OU'] = np.asarray(total)
-data = data.values
-data = data.astype(float)
-acc_results = []
-
-for x in tqdm(range(100)):
-    x_train, x_test, y_train, y_test = train_test_split(data, OU, test_size=.1)
-
-    train = xgb.DMatrix(x_train, label=y_train)
-    test = xgb.DMatrix(x_test)
-
-    param = {
-        'max_depth': 20,
-        'eta': 0.05,
-        'objective': 'multi:softprob',
-        'num_class': 3
-    }
-    epochs = 750
-
-    model = xgb.train(param, train, epochs)
-
-    predictions = model.predict(test)
-    y = []
-
-    for z in predictions:
-        y.append(np.argmax(z))
-
-    acc = round(accuracy_score(y_test, y) * 100, 1)
-    print(f"{acc}%")
-    acc_results.append(acc)
-    # only save results if they are the best so far
-    if acc == max(acc_results):
-        model.save_model('../../Models/XGBoost_{}%_UO-9.json'.format(acc))
+param = {
+    'max_depth': 20,
+    'eta': 0.05,
+    'objective': 'multi:softprob',
+    'tree_method': 'hist',
+    'num_class': 3
+}
+epochs = 750
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the over/under XGBoost model over many random splits')
+    parser.add_argument('-trials', type=int, default=100, help='Number of random train/test splits to train')
+    parser.add_argument('-workers', type=int, default=None, help='Parallel trials, defaults to cores / threads')
+    parser.add_argument('-threads', type=int, default=1, help='XGBoost threads per trial')
+    parser.add_argument('-seed', type=int, default=None, help='Seed for the train/test splits')
+    parser.add_argument('-early_stopping', type=int, default=0,
+                        help='Stop after this many rounds without validation improvement (e.g. 50), '
+                             'holding out 10%% of the training rows; 0 trains every round on all of them')
+    parser.add_argument('-eval_log', type=int, default=0, help='Print eval metrics every this many rounds')
+    args = parser.parse_args()
+
+    # builds the feature store once if Create_Games has not written it yet
+    load_feature_store(dataset, "../../Data/dataset.sqlite")
+
+    run_trials('XGBoost_UO', dataset, 'ou', 'OU-Cover', param, epochs, args.trials,
+               '../../Models/XGBoost_{}%_UO-9.json', workers=args.workers, threads=args.threads, seed=args.seed,
+               early_stopping_rounds=args.early_stopping, eval_period=args.eval_log)
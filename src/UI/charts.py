@@ -283,5 +283,8 @@ class GamePredictionWidget(QWidget):
         self.away_kelly_gauge.setVisible(show_kelly)
         
         # Set O/U prediction text
-        ou_text = f"{prediction['ou_pick']} {prediction['ou_value']} ({prediction['ou_confidence']}% confidence)"
+        if prediction['ou_pick'] is None:
+            ou_text = "No O/U model available"
+        else:
+            ou_text = f"{prediction['ou_pick']} {prediction['ou_value']} ({prediction['ou_confidence']}% confidence)"
         self.ou_label.setText(ou_text)
\ No newline at end of file
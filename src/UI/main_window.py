@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-import tensorflow as tf
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QTableWidget, QTableWidgetItem, QPushButton, 
                             QComboBox, QTabWidget, QGridLayout, QFrame, QCheckBox,
@@ -10,9 +9,11 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor, QFont, QIcon
 
-from src.Predict import NN_Runner, XGBoost_Runner
-from src.Utils.Dictionaries import team_index_current
-from src.Utils.tools import create_todays_games_from_odds, get_json_data, to_data_frame, get_todays_games_json, create_todays_games
+from src.Predict.Prediction_Service import get_runner
+from src.Utils.Team_Registry import get_team_id
+from src.Utils.Schedule_Index import get_schedule_index
+from src.Utils.tools import create_todays_games_from_odds, get_json_data, to_data_frame, get_todays_games_json, create_todays_games, \
+    games_with_team_stats, normalize, team_stats_ttl
 from src.DataProviders.SbrOddsProvider import SbrOddsProvider
 from src.UI.charts import GamePredictionWidget
 
@@ -59,7 +60,7 @@ class PredictionThread(QThread):
     
     def _run_xgboost(self):
         """Run the XGBoost model and return results"""
-        return XGBoost_Runner.xgb_runner(
+        return get_runner("xgb").xgb_runner(
             self.data, 
             self.uo, 
             self.frame, 
@@ -72,7 +73,7 @@ class PredictionThread(QThread):
     
     def _run_nn(self):
         """Run the Neural Network model and return results"""
-        return NN_Runner.nn_runner(
+        return get_runner("nn").nn_runner(
             self.data, 
             self.uo, 
             self.frame, 
@@ -359,8 +360,8 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(f"Loading odds from {sportsbook}...")
         
         try:
-            # Fetch odds data
-            odds_provider = SbrOddsProvider(sportsbook=sportsbook)
+            # Fetch odds data, switching books reuses the same scoreboard snapshot
+            odds_provider = SbrOddsProvider(sportsbook=sportsbook, snapshot_ttl=60)
             self.odds = odds_provider.get_odds()
             
             if not self.odds:
@@ -429,9 +430,19 @@ class MainWindow(QMainWindow):
                     'StarterBench=&TeamID=0&TwoWay=0&VsConference=&VsDivision='
             
             # Get team stats
-            data = get_json_data(data_url)
+            data = get_json_data(data_url, cache_ttl=team_stats_ttl)
             self.team_df = to_data_frame(data)
             
+            # drop games without team stats from the games and their lines together so they stay aligned
+            kept_games = games_with_team_stats(self.games, self.team_df)
+            lines = [line for game, line in zip(self.games, zip(self.todays_games_uo, self.home_team_odds,
+                                                                 self.away_team_odds)) if game in kept_games]
+            self.games = kept_games
+            self.todays_games_uo = [line[0] for line in lines]
+            self.home_team_odds = [line[1] for line in lines]
+            self.away_team_odds = [line[2] for line in lines]
+            self._update_games_table()
+            
             # Calculate days rest for teams
             self._calculate_days_rest()
             
@@ -448,12 +459,12 @@ class MainWindow(QMainWindow):
         self.away_team_days_rest = []
         
         try:
-            # In a real implementation, this would fetch the NBA schedule
-            # and calculate days rest like in main.py
-            # For this example, we'll use placeholder values
+            # Look up each team's last game in the cached schedule index
+            schedule_index = get_schedule_index()
+            today = datetime.today()
             for game in self.games:
-                self.home_team_days_rest.append(2)  # Placeholder value
-                self.away_team_days_rest.append(1)  # Placeholder value
+                self.home_team_days_rest.append(schedule_index.days_rest(game[0], today))
+                self.away_team_days_rest.append(schedule_index.days_rest(game[1], today))
         except Exception as e:
             self.status_bar.showMessage(f"Error calculating days rest: {str(e)}")
             # Use default values
@@ -465,19 +476,19 @@ class MainWindow(QMainWindow):
         try:
             # Create match data (similar to createTodaysGames in main.py)
             match_data = []
+            stats_by_team = self.team_df.set_index('TEAM_ID', drop=False)
             
             for i, game in enumerate(self.games):
                 home_team = game[0]
                 away_team = game[1]
-                
-                if home_team not in team_index_current or away_team not in team_index_current:
-                    continue
+                home_team_id = get_team_id(home_team)
+                away_team_id = get_team_id(away_team)
                 
                 home_days_rest = self.home_team_days_rest[i] if i < len(self.home_team_days_rest) else 2
                 away_days_rest = self.away_team_days_rest[i] if i < len(self.away_team_days_rest) else 1
                 
-                home_team_series = self.team_df.iloc[team_index_current.get(home_team)]
-                away_team_series = self.team_df.iloc[team_index_current.get(away_team)]
+                home_team_series = stats_by_team.loc[home_team_id]
+                away_team_series = stats_by_team.loc[away_team_id]
                 
                 stats = pd.concat([home_team_series, away_team_series])
                 stats['Days-Rest-Home'] = home_days_rest
@@ -494,7 +505,7 @@ class MainWindow(QMainWindow):
             # For XGBoost, use data as is
             self.data = data
             # For NN, normalize data
-            self.data_normalized = tf.keras.utils.normalize(data, axis=1)
+            self.data_normalized = normalize(data, axis=1)
             
         except Exception as e:
             self.status_bar.showMessage(f"Error preparing prediction data: {str(e)}")
@@ -0,0 +1,136 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, log_loss
+
+from .Expected_Value import expected_value, payout
+from .Feature_Store import FeatureStore, store_dir
+from .Kelly_Criterion import calculate_kelly_criterion
+
+# per process data and fold matrices, kept for the life of the pool so every candidate reuses them
+_worker = {}
+
+
+def _init_worker(dataset, store_path, features, label, nthread):
+    store = FeatureStore.open(dataset, store_path)
+    _worker.update(data=store.ml_features() if features == 'ml' else store.ou_features(), labels=store.label(label),
+                   seasons=np.asarray(store.metadata('Season')), nthread=nthread, folds={})
+
+
+def _fold_matrices(season):
+    """Training matrix of every earlier season and test matrix of `season`, built once per worker"""
+    if season not in _worker['folds']:
+        seasons = _worker['seasons']
+        train_rows = np.flatnonzero(seasons < season)
+        test_rows = np.flatnonzero(seasons == season)
+        _worker['folds'][season] = (
+            xgb.QuantileDMatrix(_worker['data'][train_rows], label=_worker['labels'][train_rows],
+                                nthread=_worker['nthread']),
+            xgb.DMatrix(_worker['data'][test_rows], nthread=_worker['nthread']),
+        )
+    return _worker['folds'][season]
+
+
+def run_fold(season, params, num_rounds):
+    """Train on the seasons before `season` and return the predicted class probabilities of its games"""
+    train, test = _fold_matrices(season)
+    model = xgb.train({'tree_method': 'hist', **params, 'nthread': _worker['nthread']}, train, num_rounds)
+    return season, model.predict(test)
+
+
+def betting_results(home_probabilities, home_wins, ml_home, ml_away, kelly_fraction=1.0):
+    """Bet the side with the best positive expected value on every game, in game order
+
+    Returns the number of bets, the expected and realized profit in units of 100 staked per bet, and the
+    bankroll after every bet when staking `kelly_fraction` of the Kelly criterion, starting from 1.
+    """
+    bets = 0
+    expected_profit = profit = 0.0
+    bankroll = 1.0
+    curve = []
+    for p_home, home_win, home_odds, away_odds in zip(home_probabilities, home_wins, ml_home, ml_away):
+        if np.isnan(home_odds) or np.isnan(away_odds):
+            continue
+        sides = [(expected_value(p_home, home_odds), p_home, home_odds, home_win == 1),
+                 (expected_value(1 - p_home, away_odds), 1 - p_home, away_odds, home_win == 0)]
+        ev, probability, odds, won = max(sides, key=lambda side: side[0])
+        if ev <= 0:
+            continue
+        bets += 1
+        expected_profit += ev / 100
+        profit += payout(odds) / 100 if won else -1.0
+
+        stake = calculate_kelly_criterion(odds, probability) / 100 * kelly_fraction
+        bankroll = bankroll * (1 + stake * payout(odds) / 100) if won else bankroll * (1 - stake)
+        curve.append(bankroll)
+    return bets, expected_profit, profit, np.array(curve)
+
+
+def max_drawdown(curve):
+    if len(curve) == 0:
+        return 0.0
+    curve = np.concatenate([[1.0], curve])
+    return float(np.max(1 - curve / np.maximum.accumulate(curve)))
+
+
+class WalkForwardBacktest:
+    """Season by season walk-forward evaluation of XGBoost candidates on the feature store
+
+    Every season after the first `min_train_seasons` is a fold trained on all earlier seasons. Folds run in
+    parallel on a process pool that stays up between `run` calls, so the fold matrices are built once and
+    reused by every candidate. Use as a context manager or call `close`.
+    """
+
+    def __init__(self, dataset, features, label, min_train_seasons=3, workers=None, threads=1, store_path=store_dir):
+        store = FeatureStore.open(dataset, store_path)
+        self.features = features
+        self.labels = np.asarray(store.label(label))
+        self.n_classes = int(self.labels.max()) + 1
+        self.seasons = np.asarray(store.metadata('Season'))
+        self.ml_home = np.asarray(store.metadata('ML_Home'))
+        self.ml_away = np.asarray(store.metadata('ML_Away'))
+        self.test_seasons = [int(season) for season in np.unique(self.seasons)[min_train_seasons:]]
+        workers = workers or max(1, min(len(self.test_seasons), (os.cpu_count() or 1) // threads))
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(dataset, store_path, features, label, threads))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def run(self, params, num_rounds, kelly_fraction=1.0):
+        """Backtest one parameter set, returning a per-season report and the Kelly bankroll curve of each season
+
+        The betting columns are only filled for the money line model on datasets with money line odds.
+        """
+        start = time.monotonic()
+        futures = [self.executor.submit(run_fold, season, params, num_rounds) for season in self.test_seasons]
+        report = []
+        curves = {}
+        for future in futures:
+            season, probabilities = future.result()
+            rows = self.seasons == season
+            y = self.labels[rows]
+            row = {'season': f"{season}-{str(season + 1)[2:]}", 'games': int(rows.sum()),
+                   'accuracy': round(accuracy_score(y, np.argmax(probabilities, axis=1)) * 100, 1),
+                   'log_loss': round(float(log_loss(y, probabilities, labels=list(range(self.n_classes)))), 4)}
+            if self.features == 'ml':
+                bets, expected_profit, profit, curve = betting_results(
+                    probabilities[:, 1], y, self.ml_home[rows], self.ml_away[rows], kelly_fraction)
+                curves[row['season']] = curve
+                row.update(bets=bets, expected_units=round(expected_profit, 2), units=round(profit, 2),
+                           roi=round(profit / bets * 100, 1) if bets else np.nan,
+                           kelly_bankroll=round(float(curve[-1]), 3) if len(curve) else 1.0,
+                           kelly_drawdown=round(max_drawdown(curve) * 100, 1))
+            report.append(row)
+        print(f"Backtested {len(self.test_seasons)} seasons in {time.monotonic() - start:.1f}s")
+        return pd.DataFrame(report), curves
@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+
+class SourceTimeout(Exception):
+    """A source did not answer within its timeout"""
+
+    def __init__(self, name, timeout):
+        super().__init__(f"{name} did not respond within {timeout:g} seconds")
+        self.name = name
+        self.timeout = timeout
+
+
+class FanOut:
+    """Runs independent fetches at the same time and hands each result over as soon as it is needed
+
+    Every source gets its own timeout, counted from when it was started, so waiting on the slowest one
+    costs about as long as that source instead of the sum of all of them. Sources run on daemon threads:
+    one that misses its deadline is abandoned and can neither block the caller nor keep the process alive.
+    Sources should still bound their own work by the same timeout so abandoned ones do not pile up.
+
+        fetches = FanOut()
+        fetches.submit('team stats', get_team_stats, timeout=30)
+        fetches.submit('odds', get_odds, timeout=20)
+        odds = fetches.result('odds')
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self._deadlines = {}
+        self._timeouts = {}
+        # seconds each source took, measured from its start until its result arrived
+        self.timings = {}
+
+    def submit(self, name, fn, *args, timeout=None, **kwargs):
+        start = time.perf_counter()
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+        self._futures[name] = future
+        self._timeouts[name] = timeout
+        self._deadlines[name] = None if timeout is None else start + timeout
+        threading.Thread(target=run, name=f"fetch {name}", daemon=True).start()
+        return future
+
+    def remaining(self, name):
+        """Seconds left before the deadline of source `name`, None if it has none"""
+        deadline = self._deadlines[name]
+        return None if deadline is None else max(0., deadline - time.perf_counter())
+
+    def result(self, name):
+        """Result of source `name`, re-raising its exception or SourceTimeout if it missed its deadline"""
+        try:
+            return self._futures[name].result(timeout=self.remaining(name))
+        except TimeoutError:
+            raise SourceTimeout(name, self._timeouts[name]) from None
@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+store_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Data', 'feature_store'))
+format_version = 2
+
+label_columns = ['Score', 'Home-Team-Win', 'OU-Cover', 'OU']
+# per game values that are not model inputs, Season is the start year of the season the game was played in
+metadata_columns = ['Season', 'ML_Home', 'ML_Away']
+# identifying columns that are neither features nor labels
+excluded_columns = ['TEAM_NAME', 'Date', 'TEAM_NAME.1', 'Date.1', 'TEAM_ID', 'TEAM_ID.1', 'index']
+
+
+class FeatureStore:
+    """Memory-mapped float32 feature and label blocks of one training dataset
+
+    Features are stored column-major with the money line features first and `OU` last, so the money line
+    matrix and any other run of adjacent columns are zero-copy views of the file.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.feature_columns = manifest['feature_columns']
+        self.label_columns = manifest['label_columns']
+        self._features = np.load(os.path.join(path, 'features.npy'), mmap_mode='r')
+        self._labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+        self._metadata = np.load(os.path.join(path, 'metadata.npy'), mmap_mode='r')
+
+    @classmethod
+    def open(cls, dataset, path=store_dir):
+        """Open a stored dataset, raising FileNotFoundError when it has not been written"""
+        dataset_path = os.path.join(path, dataset)
+        with open(os.path.join(dataset_path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != format_version:
+            raise ValueError(f"Feature store {dataset} has version {manifest.get('version')}, "
+                             f"expected {format_version}, rebuild it with Create_Games")
+        return cls(dataset_path, manifest)
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def features(self, columns=None):
+        """Feature matrix for `columns` (all features by default), a view when the columns are adjacent"""
+        if columns is None:
+            return self._features
+        positions = [self.feature_columns.index(column) for column in columns]
+        if positions == list(range(positions[0], positions[0] + len(positions))):
+            return self._features[:, positions[0]:positions[-1] + 1]
+        return self._features[:, positions]
+
+    def ml_features(self):
+        """Features used by the money line models, every feature except the over/under line"""
+        return self.features(self.feature_columns[:-1])
+
+    def ou_features(self):
+        """Features used by the over/under models, the money line features followed by the line"""
+        return self._features
+
+    def label(self, name):
+        return self._labels[:, self.label_columns.index(name)]
+
+    def metadata(self, name):
+        """Metadata column, NaN for games whose dataset did not have it"""
+        return self._metadata[:, self.manifest['metadata_columns'].index(name)]
+
+
+def season_start_years(dates):
+    """Start year of the season of each 'YYYY-MM-DD' date, games before August belong to the previous year"""
+    dates = pd.to_datetime(pd.Series(dates).str[:10], format='%Y-%m-%d')
+    return (dates.dt.year - (dates.dt.month < 8)).to_numpy(dtype=np.float64)
+
+
+def write_feature_store(frame, dataset, path=store_dir):
+    """Write an assembled games frame as float32 feature and label blocks, a metadata block and a manifest"""
+    dataset_path = os.path.join(path, dataset)
+    os.makedirs(dataset_path, exist_ok=True)
+
+    feature_columns = [column for column in frame.columns if column not in label_columns
+                       and column not in excluded_columns and column not in metadata_columns] + ['OU']
+    features = np.asfortranarray(frame[feature_columns].to_numpy(dtype=np.float32))
+    labels = np.asfortranarray(frame[label_columns].to_numpy(dtype=np.float32))
+    metadata = frame.reindex(columns=metadata_columns).to_numpy(dtype=np.float64)
+    if 'Date' in frame:
+        metadata[:, 0] = season_start_years(frame['Date'])
+
+    # the manifest goes last, readers never see a half written store
+    manifest_path = os.path.join(dataset_path, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    np.save(os.path.join(dataset_path, 'features.npy'), features)
+    np.save(os.path.join(dataset_path, 'labels.npy'), labels)
+    np.save(os.path.join(dataset_path, 'metadata.npy'), metadata)
+    manifest = {
+        'version': format_version,
+        'dataset': dataset,
+        'rows': len(frame.index),
+        'dtype': 'float32',
+        'feature_columns': feature_columns,
+        'label_columns': label_columns,
+        'metadata_columns': metadata_columns,
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_feature_store(dataset, sqlite_path, path=store_dir):
+    """Open a stored dataset, building it once from its dataset.sqlite table if it is missing or outdated"""
+    try:
+        return FeatureStore.open(dataset, path)
+    except (FileNotFoundError, ValueError):
+        pass
+    print(f"Building feature store for {dataset} from {sqlite_path}")
+    con = sqlite3.connect(sqlite_path)
+    frame = pd.read_sql_query(f"select * from \"{dataset}\"", con, index_col="index")
+    con.close()
+    write_feature_store(frame, dataset, path)
+    return FeatureStore.open(dataset, path)
@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+
+class FetchLog:
+    """Checkpoint table recording which dates of a dataset have been fetched and when
+
+    Lets the download scripts resume an interrupted run and only refetch dates that are missing or stale.
+    A date counts as stale until it has been fetched at least `stale_days` days after it, since stats and
+    scores for recent games can still change.
+    """
+
+    def __init__(self, con, stale_days=1, table="fetch_log"):
+        self.con = con
+        self.stale_days = stale_days
+        self.table = table
+        self.con.execute(f'create table if not exists "{self.table}" '
+                         f'(dataset TEXT NOT NULL, date TEXT NOT NULL, fetched_at TEXT NOT NULL, '
+                         f'PRIMARY KEY (dataset, date))')
+        self.con.commit()
+
+    def fetched(self, dataset):
+        """Return {date: fetched_at datetime} for every logged date of `dataset`"""
+        rows = self.con.execute(f'select date, fetched_at from "{self.table}" where dataset = ?', (dataset,))
+        return {datetime.strptime(d, "%Y-%m-%d").date(): datetime.fromisoformat(f) for d, f in rows}
+
+    def mark(self, dataset, fetched_date, fetched_at=None):
+        """Record `fetched_date` of `dataset` as fetched and commit, so it survives an interrupted run"""
+        fetched_at = datetime.now() if fetched_at is None else fetched_at
+        self.con.execute(f'insert or replace into "{self.table}" (dataset, date, fetched_at) values (?, ?, ?)',
+                         (dataset, str(fetched_date), fetched_at.isoformat(timespec='seconds')))
+        self.con.commit()
+
+    def is_stale(self, fetched_date, fetched_at=None, today=None):
+        """Whether `fetched_date` still needs fetching given when it was last fetched, None if never logged"""
+        today = date.today() if today is None else today
+        if fetched_at is None:
+            return fetched_date >= today - timedelta(days=self.stale_days)
+        return fetched_at.date() < fetched_date + timedelta(days=self.stale_days)
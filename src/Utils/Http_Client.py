@@ -0,0 +1,258 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .Response_Cache import ResponseCache, cache_key
+
+# (connect, read) seconds, a stalled connection fails instead of hanging the caller
+default_timeout = (3.05, 30)
+retry_statuses = {429, 500, 502, 503, 504}
+# errors of a single attempt that a retry can fix, anything else is raised right away
+retry_errors = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Requests to a host are failing fast after too many consecutive errors"""
+
+
+class CircuitBreaker:
+    """Stops calling a host after `failure_threshold` consecutive failures, never when it is None
+
+    Once open, calls fail immediately until `reset_timeout` seconds have passed. Then a single trial call is let
+    through: success closes the circuit again, failure keeps it open for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half-open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or (self.failure_threshold is not None
+                                       and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class HostStats:
+    """Request, error and latency counters of one host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+        self.total_latency = 0.
+        self.max_latency = 0.
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'cache_hits': self.cache_hits,
+            'revalidated': self.revalidated,
+            'mean_latency_ms': self.total_latency / self.requests * 1000 if self.requests else 0.,
+            'max_latency_ms': self.max_latency * 1000,
+        }
+
+
+class HttpClient:
+    """Shared HTTP client with pooled keep-alive connections, timeouts, jittered retries and a per-host circuit breaker
+
+    Connection and read errors, timeouts, broken chunked bodies and 429/5xx answers are retried `retries` times with jittered
+    exponential backoff. Every host keeps its own circuit breaker and request, error and latency counters.
+
+    Requests made with a `cache_ttl` go through the response cache: a response younger than the TTL is served
+    without any network I/O, an older one is revalidated with its ETag/Last-Modified, and the last good response
+    is served when the host fails. In `offline` mode only cached responses are served.
+    """
+
+    def __init__(self, timeout=default_timeout, retries=2, backoff=0.5, pool_size=10, failure_threshold=5,
+                 reset_timeout=30, cache=None, offline=False):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.cache = cache
+        self.offline = offline
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._stats[host] = HostStats()
+            return self._breakers[host], self._stats[host]
+
+    def get(self, url, headers=None, params=None, timeout=None, cache_ttl=None, budget=None, validate=None):
+        """GET `url`, returning the response of the first attempt that did not fail or the last failed one
+
+        Args:
+            timeout: (connect, read) or single timeout of each attempt, the client's default when None
+            cache_ttl: seconds a cached response is served without asking the server, None to bypass the cache
+            budget: seconds all attempts together may take, every attempt's timeout is cut to what is left
+                and no retry starts once it is used up
+            validate: called with a 200 response, only responses it accepts are cached, when it rejects one the
+                last good cached response is returned instead if there is one
+
+        Raises:
+            CircuitOpenError: the host's circuit is open
+            requests.RequestException: the last attempt failed with a connection error or timeout, or the client
+                is offline and has no cached response
+        """
+        if cache_ttl is not None and self.cache is not None:
+            return self._cached_get(url, headers, params, timeout, cache_ttl, budget, validate)
+        if self.offline:
+            raise requests.ConnectionError(f"Offline, not fetching {url}")
+        return self._get(url, headers, params, timeout, budget)
+
+    def _cached_get(self, url, headers, params, timeout, cache_ttl, budget, validate):
+        key = cache_key(url, params)
+        entry = self.cache.get(key)
+        _, stats = self._host(urlsplit(url).netloc)
+        if entry is not None and (self.offline or entry.age() < cache_ttl):
+            with self._lock:
+                stats.cache_hits += 1
+            return entry.to_response()
+        if self.offline:
+            raise requests.ConnectionError(f"Offline and no cached response for {url}")
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.validators())
+        try:
+            response = self._get(url, request_headers, params, timeout, budget)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            print(f"{e}, using the response cached {entry.age() / 60:.0f} minutes ago")
+            return entry.to_response()
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            with self._lock:
+                stats.revalidated += 1
+            return entry.to_response()
+        if response.status_code == 200 and (validate is None or validate(response)):
+            self.cache.put(key, response)
+        elif entry is not None:
+            # keep serving the last good snapshot while the host answers with errors or unusable bodies
+            print(f"Bad response from {urlsplit(url).netloc}, using the response cached "
+                  f"{entry.age() / 60:.0f} minutes ago")
+            return entry.to_response()
+        return response
+
+    def _get(self, url, headers, params, timeout, budget):
+        breaker, stats = self._host(urlsplit(url).netloc)
+        timeout = self.timeout if timeout is None else timeout
+        end = None if budget is None else time.monotonic() + budget
+        response = error = None
+        for attempt in range(self.retries + 1):
+            attempt_timeout = timeout
+            if end is not None:
+                left = end - time.monotonic()
+                if left <= 0:
+                    break
+                attempt_timeout = tuple(min(t, left) for t in timeout) if isinstance(timeout, tuple) \
+                    else min(timeout, left)
+            if not breaker.allow():
+                with self._lock:
+                    stats.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc} after repeated failures")
+            start = time.perf_counter()
+            error = None
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=attempt_timeout)
+            except retry_errors as e:
+                response, error = None, e
+            except BaseException:
+                # still counts against the host, and always ends a half-open trial call
+                with self._lock:
+                    stats.requests += 1
+                    stats.errors += 1
+                breaker.failure()
+                raise
+            latency = time.perf_counter() - start
+            failed = error is not None or response.status_code in retry_statuses
+            with self._lock:
+                stats.requests += 1
+                stats.total_latency += latency
+                stats.max_latency = max(stats.max_latency, latency)
+                stats.errors += failed
+            if not failed:
+                breaker.success()
+                return response
+            breaker.failure()
+            delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+            if attempt == self.retries or (end is not None and time.monotonic() + delay >= end):
+                break
+            with self._lock:
+                stats.retries += 1
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        if response is None:
+            raise requests.Timeout(f"No time left within the {budget:g} second budget to fetch {url}")
+        return response
+
+    def stats(self):
+        """{host: counters} of every host called so far, with the state of its circuit"""
+        with self._lock:
+            return {host: dict(stats.as_dict(), circuit=self._breakers[host].state)
+                    for host, stats in self._stats.items()}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process wide HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(cache=ResponseCache())
+        return _client
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import train_test_split
+
+from .Feature_Store import FeatureStore, store_dir
+from .Trial_Driver import results_db
+
+# search spaces as {param: (kind, *args)}, kinds are int and float ranges, log-uniform ranges and choices
+xgb_space = {
+    'max_depth': ('int', 2, 20),
+    'eta': ('log', 0.005, 0.3),
+    'min_child_weight': ('log', 1, 20),
+    'subsample': ('float', 0.5, 1.0),
+    'colsample_bytree': ('float', 0.4, 1.0),
+}
+nn_space = {
+    'layers': ('choice', [[128], [256, 128], [512, 256, 128], [256, 256]]),
+    'learning_rate': ('log', 1e-4, 1e-2),
+    'batch_size': ('choice', [32, 128, 512]),
+}
+
+# per process validation split, set once by the pool initializer
+_worker = {}
+
+
+def sample_config(space, rng):
+    """Draw one configuration from a search space"""
+    config = {}
+    for name, (kind, *args) in space.items():
+        if kind == 'int':
+            config[name] = int(rng.integers(args[0], args[1] + 1))
+        elif kind == 'float':
+            config[name] = float(rng.uniform(args[0], args[1]))
+        elif kind == 'log':
+            config[name] = float(np.exp(rng.uniform(np.log(args[0]), np.log(args[1]))))
+        elif kind == 'choice':
+            config[name] = args[0][int(rng.integers(len(args[0])))]
+        else:
+            raise ValueError(f"Unknown search space kind {kind} for {name}")
+    return config
+
+
+class Study:
+    """Local SQLite record of a search, every evaluated configuration at every rung it reached"""
+
+    def __init__(self, con, name, settings=None):
+        self.con = con
+        self.name = name
+        self.con.execute('create table if not exists "studies" '
+                         '(name TEXT PRIMARY KEY, settings TEXT NOT NULL, created TEXT NOT NULL)')
+        self.con.execute('create table if not exists "study_trials" '
+                         '(study TEXT NOT NULL, trial INTEGER NOT NULL, rung INTEGER NOT NULL, '
+                         'resource INTEGER NOT NULL, params TEXT NOT NULL, loss REAL NOT NULL, '
+                         'accuracy REAL NOT NULL, seconds REAL NOT NULL, finished_at TEXT NOT NULL, '
+                         'PRIMARY KEY (study, trial, rung))')
+        self.con.execute('insert or ignore into "studies" (name, settings, created) values (?, ?, ?)',
+                         (name, json.dumps(settings or {}), datetime.now().isoformat(timespec='seconds')))
+        self.con.commit()
+
+    def record(self, result):
+        self.con.execute('insert or replace into "study_trials" '
+                         '(study, trial, rung, resource, params, loss, accuracy, seconds, finished_at) '
+                         'values (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (self.name, result['trial'], result['rung'], result['resource'],
+                          json.dumps(result['config']), result['loss'], result['accuracy'], result['seconds'],
+                          datetime.now().isoformat(timespec='seconds')))
+        self.con.commit()
+
+    def best(self, limit=5):
+        """Best configurations by the highest rung they reached, as (trial, resource, params, loss, accuracy)"""
+        rows = self.con.execute('select trial, resource, params, loss, accuracy from "study_trials" t '
+                                'where study = ? and rung = (select max(rung) from "study_trials" '
+                                'where study = t.study and trial = t.trial) '
+                                'order by rung desc, loss limit ?', (self.name, limit))
+        return [(trial, resource, json.loads(params), loss, accuracy)
+                for trial, resource, params, loss, accuracy in rows]
+
+
+def _init_worker(model, dataset, store_path, features, label, valid_size, seed, nthread):
+    store = FeatureStore.open(dataset, store_path)
+    data = store.ml_features() if features == 'ml' else store.ou_features()
+    labels = store.label(label)
+    # every configuration is scored on the same held-out rows
+    x_train, x_valid, y_train, y_valid = train_test_split(data, labels, test_size=valid_size, random_state=seed)
+    _worker.update(nthread=nthread, n_classes=int(labels.max()) + 1, y_valid=y_valid)
+    if model == 'xgb':
+        _worker['train'] = xgb.QuantileDMatrix(x_train, label=y_train, nthread=nthread)
+        _worker['valid'] = xgb.DMatrix(x_valid, nthread=nthread)
+    else:
+        # only the neural network search pays for importing tensorflow
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(nthread)
+        tf.config.threading.set_inter_op_parallelism_threads(nthread)
+        _worker.update(x_train=tf.keras.utils.normalize(x_train, axis=1), y_train=y_train,
+                       x_valid=tf.keras.utils.normalize(x_valid, axis=1))
+
+
+def _train_xgb(config, resource):
+    params = {'objective': 'multi:softprob', 'num_class': _worker['n_classes'], 'tree_method': 'hist',
+              **config, 'nthread': _worker['nthread']}
+    model = xgb.train(params, _worker['train'], resource)
+    return model.predict(_worker['valid'])
+
+
+def _train_nn(config, resource):
+    import tensorflow as tf
+    model = tf.keras.models.Sequential()
+    model.add(tf.keras.layers.Flatten())
+    for units in config['layers']:
+        model.add(tf.keras.layers.Dense(units, activation=tf.nn.relu6))
+    model.add(tf.keras.layers.Dense(_worker['n_classes'], activation=tf.nn.softmax))
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=config['learning_rate']),
+                  loss='sparse_categorical_crossentropy')
+    model.fit(_worker['x_train'], _worker['y_train'], epochs=resource, batch_size=config['batch_size'], verbose=0)
+    return model.predict(_worker['x_valid'], batch_size=4096, verbose=0)
+
+
+def evaluate(model, trial, rung, config, resource):
+    """Train one configuration with `resource` boosting rounds or epochs and score it on the validation rows"""
+    start = time.monotonic()
+    probabilities = (_train_xgb if model == 'xgb' else _train_nn)(config, resource)
+    y_valid = _worker['y_valid']
+    return {'trial': trial, 'rung': rung, 'resource': resource, 'config': config,
+            'loss': float(log_loss(y_valid, probabilities, labels=list(range(_worker['n_classes'])))),
+            'accuracy': round(accuracy_score(y_valid, np.argmax(probabilities, axis=1)) * 100, 1),
+            'seconds': time.monotonic() - start}
+
+
+def successive_halving(study_name, model, dataset, features, label, n_configs, min_resource, max_resource,
+                       reduction=3, space=None, workers=1, threads=1, valid_size=.1, seed=None,
+                       store_path=store_dir, results_path=results_db):
+    """Search hyperparameters of the 'xgb' or 'nn' model by successive halving
+
+    `n_configs` sampled configurations are trained with `min_resource` rounds (XGBoost) or epochs (NN), the best
+    1 / `reduction` by validation log-loss move on with `reduction` times the resource, until one is left or
+    `max_resource` is reached. Each rung runs in parallel on `workers` processes. Returns the study's best
+    configurations.
+    """
+    space = space or (xgb_space if model == 'xgb' else nn_space)
+    rng = np.random.default_rng(seed)
+    configs = {trial: sample_config(space, rng) for trial in range(n_configs)}
+    study = Study(sqlite3.connect(results_path), study_name,
+                  {'model': model, 'dataset': dataset, 'features': features, 'label': label, 'seed': seed,
+                   'min_resource': min_resource, 'max_resource': max_resource, 'reduction': reduction,
+                   'space': space})
+
+    survivors = list(configs)
+    resource = min_resource
+    rung = 0
+    split_seed = int(rng.integers(2 ** 31 - 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model, dataset, store_path, features, label, valid_size, split_seed,
+                                       threads)) as executor:
+        while True:
+            futures = [executor.submit(evaluate, model, trial, rung, configs[trial], resource) for trial in survivors]
+            losses = {}
+            for future in as_completed(futures):
+                result = future.result()
+                study.record(result)
+                losses[result['trial']] = result['loss']
+                print(f"rung {rung} trial {result['trial']} ({resource}): "
+                      f"loss {result['loss']:.4f}, {result['accuracy']}%")
+
+            if len(survivors) <= 1 or resource >= max_resource:
+                break
+            survivors = sorted(survivors, key=losses.get)[:max(1, len(survivors) // reduction)]
+            resource = min(resource * reduction, max_resource)
+            rung += 1
+
+    best = study.best()
+    study.con.close()
+    return best
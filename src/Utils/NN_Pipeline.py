@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+import tensorflow as tf
+
+
+def make_datasets(x, y, batch_size, validation_split=0.1, shuffle_buffer=None, seed=None):
+    """Cached, shuffled and prefetched tf.data pipelines for training and validation
+
+    Rows are normalized like the models expect at prediction time, and the validation rows are the last
+    `validation_split` of the data as with `model.fit(validation_split=...)`. Returns the training and
+    validation datasets and the number of training steps per epoch.
+    """
+    x = tf.keras.utils.normalize(np.asarray(x, dtype=np.float32), axis=1).astype(np.float32)
+    y = np.asarray(y, dtype=np.int32)
+    split = int(math.floor(len(x) * (1. - validation_split)))
+
+    options = tf.data.Options()
+    # order across parallel batches does not matter for training and lets the pipeline keep every core busy
+    options.deterministic = seed is not None
+    train = tf.data.Dataset.from_tensor_slices((x[:split], y[:split])) \
+        .cache() \
+        .shuffle(shuffle_buffer or split, seed=seed, reshuffle_each_iteration=True) \
+        .batch(batch_size, num_parallel_calls=tf.data.AUTOTUNE) \
+        .prefetch(tf.data.AUTOTUNE) \
+        .with_options(options)
+    valid = tf.data.Dataset.from_tensor_slices((x[split:], y[split:])) \
+        .batch(max(batch_size, 1024)) \
+        .cache() \
+        .prefetch(tf.data.AUTOTUNE)
+    return train, valid, math.ceil(split / batch_size)
+
+
+def default_learning_rate(batch_size):
+    """Adam's default rate at batch size 32, scaled with the square root of larger batches"""
+    return 1e-3 * math.sqrt(batch_size / 32)
+
+
+def learning_rate_schedule(peak, schedule, steps_per_epoch, epochs, warmup_epochs=2):
+    """Constant rate, or a linear warmup to `peak` followed by cosine decay over the remaining steps"""
+    if schedule == 'constant':
+        return peak
+    total_steps = steps_per_epoch * epochs
+    warmup_steps = min(steps_per_epoch * warmup_epochs, total_steps // 2)
+    return tf.keras.optimizers.schedules.CosineDecay(peak / 10, max(1, total_steps - warmup_steps), alpha=0.01,
+                                                     warmup_target=peak, warmup_steps=warmup_steps)
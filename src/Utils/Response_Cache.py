@@ -0,0 +1,111 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+cache_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Data', 'http_cache.sqlite'))
+
+
+def cache_key(url, params=None):
+    """Full request URL with the query parameters in a fixed order"""
+    if params:
+        params = sorted(params.items())
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class CachedResponse:
+    """Body, headers and validators of a stored response"""
+
+    def __init__(self, url, status, headers, body, fetched_at):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.fetched_at = fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def validators(self):
+        """Conditional request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self):
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.url = self.url
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """Successful GET responses stored in a sqlite file, evicting the least recently used ones past `max_bytes`"""
+
+    def __init__(self, path=cache_file, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.execute('create table if not exists responses (key TEXT PRIMARY KEY, url TEXT NOT NULL, '
+                         'status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, '
+                         'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)')
+        self.con.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self.con.execute('select url, status, headers, body, fetched_at from responses where key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            self.con.execute('update responses set accessed_at = ? where key = ?', (time.time(), key))
+            self.con.commit()
+        url, status, headers, body, fetched_at = row
+        return CachedResponse(url, status, json.loads(headers), body, fetched_at)
+
+    def put(self, key, response):
+        now = time.time()
+        # only the headers needed for revalidation and decoding are kept
+        headers = {name: response.headers[name] for name in ('ETag', 'Last-Modified', 'Content-Type')
+                   if name in response.headers}
+        body = response.content
+        with self._lock:
+            self.con.execute('insert or replace into responses values (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (key, response.url, response.status_code, json.dumps(headers), body, now, now,
+                              len(body)))
+            self._evict()
+            self.con.commit()
+
+    def touch(self, key):
+        """Mark a stored response as fresh again after the server confirmed it is unchanged"""
+        with self._lock:
+            now = time.time()
+            self.con.execute('update responses set fetched_at = ?, accessed_at = ? where key = ?', (now, now, key))
+            self.con.commit()
+
+    def size(self):
+        with self._lock:
+            return self.con.execute('select coalesce(sum(size), 0) from responses').fetchone()[0]
+
+    def _evict(self):
+        total = self.con.execute('select coalesce(sum(size), 0) from responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.con.execute('select key, size from responses order by accessed_at').fetchall():
+            self.con.execute('delete from responses where key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        self.con.close()
@@ -0,0 +1,99 @@
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Data'))
+schedule_files = [os.path.join(data_dir, 'nba-2024-UTC.csv')]
+cache_file = os.path.join(data_dir, 'schedule_index.pkl')
+
+
+class ScheduleIndex:
+    """Per-team sorted arrays of game datetimes built from the season schedule CSVs
+
+    Finding a team's last game before a given time is a binary search instead of a filter and sort of the
+    whole schedule.
+    """
+
+    def __init__(self, team_games, source_key=None):
+        self.team_games = team_games
+        self.source_key = source_key
+
+    @classmethod
+    def from_csvs(cls, paths):
+        """Build the index from one or more schedule CSVs"""
+        frames = [pd.read_csv(path, parse_dates=['Date'], date_format='%d/%m/%Y %H:%M') for path in paths]
+        schedule_df = pd.concat(frames, ignore_index=True)
+        appearances = pd.concat([
+            schedule_df[['Home Team', 'Date']].rename(columns={'Home Team': 'Team'}),
+            schedule_df[['Away Team', 'Date']].rename(columns={'Away Team': 'Team'})
+        ])
+        team_games = {
+            team: np.sort(group['Date'].values.astype('datetime64[s]'))
+            for team, group in appearances.groupby('Team')
+        }
+        return cls(team_games, source_key=_source_key(paths))
+
+    @classmethod
+    def load(cls, paths=None, cache_path=cache_file):
+        """Load the index from the on-disk cache, rebuilding it when any of the CSVs changed"""
+        paths = schedule_files if paths is None else paths
+        source_key = _source_key(paths)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    index = pickle.load(f)
+                if isinstance(index, cls) and index.source_key == source_key:
+                    return index
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                pass
+        index = cls.from_csvs(paths)
+        if cache_path:
+            try:
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(index, f)
+            except OSError as e:
+                print(f"Could not write schedule index cache: {e}")
+        return index
+
+    def last_game_before(self, team, when):
+        """Return the datetime of the team's last game at or before `when`, None if it has not played yet"""
+        games = self.team_games.get(team)
+        if games is None or len(games) == 0:
+            return None
+        position = np.searchsorted(games, np.datetime64(when, 's'), side='right')
+        if position == 0:
+            return None
+        return games[position - 1].astype(datetime)
+
+    def days_rest(self, team, when=None):
+        """Days off for `team` going into a game at `when`, 7 when it has no previous game in the schedule"""
+        when = datetime.today() if when is None else when
+        last_game = self.last_game_before(team, when)
+        if last_game is None:
+            return timedelta(days=7).days
+        return (timedelta(days=1) + when - last_game).days
+
+
+def _source_key(paths):
+    key = []
+    for path in paths:
+        stat = os.stat(path)
+        key.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+_schedule_index = None
+_schedule_index_lock = threading.Lock()
+
+
+def get_schedule_index():
+    """Return the process-wide schedule index, loading it on first use"""
+    global _schedule_index
+    with _schedule_index_lock:
+        if _schedule_index is None:
+            _schedule_index = ScheduleIndex.load()
+        return _schedule_index
@@ -0,0 +1,66 @@
+import pandas as pd
+
+# NBA stats TEAM_ID of every franchise with the names it has played under, as (first season, name) in order.
+# TEAM_IDs follow the franchise through relocations and renames, so they join across seasons where names do not.
+franchises = {
+    1610612737: ('ATL', [('2007-08', 'Atlanta Hawks')]),
+    1610612738: ('BOS', [('2007-08', 'Boston Celtics')]),
+    1610612739: ('CLE', [('2007-08', 'Cleveland Cavaliers')]),
+    1610612740: ('NOP', [('2007-08', 'New Orleans Hornets'), ('2013-14', 'New Orleans Pelicans')]),
+    1610612741: ('CHI', [('2007-08', 'Chicago Bulls')]),
+    1610612742: ('DAL', [('2007-08', 'Dallas Mavericks')]),
+    1610612743: ('DEN', [('2007-08', 'Denver Nuggets')]),
+    1610612744: ('GSW', [('2007-08', 'Golden State Warriors')]),
+    1610612745: ('HOU', [('2007-08', 'Houston Rockets')]),
+    1610612746: ('LAC', [('2007-08', 'Los Angeles Clippers'), ('2015-16', 'LA Clippers')]),
+    1610612747: ('LAL', [('2007-08', 'Los Angeles Lakers')]),
+    1610612748: ('MIA', [('2007-08', 'Miami Heat')]),
+    1610612749: ('MIL', [('2007-08', 'Milwaukee Bucks')]),
+    1610612750: ('MIN', [('2007-08', 'Minnesota Timberwolves')]),
+    1610612751: ('BKN', [('2007-08', 'New Jersey Nets'), ('2012-13', 'Brooklyn Nets')]),
+    1610612752: ('NYK', [('2007-08', 'New York Knicks')]),
+    1610612753: ('ORL', [('2007-08', 'Orlando Magic')]),
+    1610612754: ('IND', [('2007-08', 'Indiana Pacers')]),
+    1610612755: ('PHI', [('2007-08', 'Philadelphia 76ers')]),
+    1610612756: ('PHX', [('2007-08', 'Phoenix Suns')]),
+    1610612757: ('POR', [('2007-08', 'Portland Trail Blazers')]),
+    1610612758: ('SAC', [('2007-08', 'Sacramento Kings')]),
+    1610612759: ('SAS', [('2007-08', 'San Antonio Spurs')]),
+    1610612760: ('OKC', [('2007-08', 'Seattle SuperSonics'), ('2008-09', 'Oklahoma City Thunder')]),
+    1610612761: ('TOR', [('2007-08', 'Toronto Raptors')]),
+    1610612762: ('UTA', [('2007-08', 'Utah Jazz')]),
+    1610612763: ('MEM', [('2007-08', 'Memphis Grizzlies')]),
+    1610612764: ('WAS', [('2007-08', 'Washington Wizards')]),
+    1610612765: ('DET', [('2007-08', 'Detroit Pistons')]),
+    1610612766: ('CHA', [('2007-08', 'Charlotte Bobcats'), ('2014-15', 'Charlotte Hornets')]),
+}
+
+# every name, abbreviation and historical name resolves to its franchise, the odds data uses current names
+# for all seasons while the stats snapshots use the name of the season
+team_ids_by_name = {
+    name: team_id
+    for team_id, (abbreviation, names) in franchises.items()
+    for name in [abbreviation] + [season_name for first_season, season_name in names]
+}
+
+
+def get_team_id(name):
+    """TEAM_ID of a team name, abbreviation or former name, None when the name is unknown"""
+    return team_ids_by_name.get(name)
+
+
+def get_team_ids(names):
+    """Vectorized get_team_id for a Series of names, unknown names are <NA>"""
+    return pd.Series(names).map(team_ids_by_name).astype('Int64')
+
+
+def get_team_name(team_id, season=None):
+    """Name the franchise played under in `season` (e.g. '2012-13'), its current name without a season"""
+    names = franchises[team_id][1]
+    if season is None:
+        return names[-1][1]
+    name = names[0][1]
+    for first_season, season_name in names:
+        if first_season <= season:
+            name = season_name
+    return name
@@ -0,0 +1,36 @@
+import pandas as pd
+
+team_stats_table = "team_stats"
+
+
+def table_exists(con, name):
+    return con.execute("select 1 from sqlite_master where type = 'table' and name = ?", (name,)).fetchone() is not None
+
+
+def create_index(con):
+    """Create the (Date, TEAM_ID) index that keeps date range scans and per-day replaces fast"""
+    con.execute(f'create unique index if not exists "idx_{team_stats_table}_date_team" '
+                f'on "{team_stats_table}" (Date, TEAM_ID)')
+    con.commit()
+
+
+def write_team_stats(con, df):
+    """Store one or more days of team stats in the long table, replacing any rows already stored for those days"""
+    if table_exists(con, team_stats_table):
+        con.executemany(f'delete from "{team_stats_table}" where Date = ?',
+                        [(date,) for date in df['Date'].unique()])
+    df.to_sql(team_stats_table, con, if_exists="append")
+    create_index(con)
+
+
+def read_team_stats(con, start_date, end_date):
+    """Read every team's stats for the days between `start_date` and `end_date` with a single range scan"""
+    return pd.read_sql_query(f'select * from "{team_stats_table}" where Date between ? and ? order by Date, "index"',
+                             con, params=(str(start_date), str(end_date)), index_col="index")
+
+
+def stored_dates(con):
+    """Return the set of days that already have team stats stored"""
+    if not table_exists(con, team_stats_table):
+        return set()
+    return {row[0] for row in con.execute(f'select distinct Date from "{team_stats_table}"')}
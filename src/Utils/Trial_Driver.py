@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from tqdm import tqdm
+
+from .Feature_Store import FeatureStore, store_dir
+
+results_db = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Data', 'trials.sqlite'))
+
+# per process training data, set once by the pool initializer
+_worker = {}
+
+
+class TrialResults:
+    """Table of per-trial metrics, written as each trial finishes so a long run can be followed or interrupted"""
+
+    def __init__(self, con, table="xgboost_trials"):
+        self.con = con
+        self.table = table
+        self.con.execute(f'create table if not exists "{self.table}" '
+                         f'(run TEXT NOT NULL, model TEXT NOT NULL, trial INTEGER NOT NULL, seed INTEGER NOT NULL, '
+                         f'accuracy REAL NOT NULL, seconds REAL NOT NULL, params TEXT NOT NULL, '
+                         f'finished_at TEXT NOT NULL, rounds INTEGER, PRIMARY KEY (run, model, trial))')
+        # tables created before early stopping have no rounds column
+        columns = [row[1] for row in self.con.execute(f'pragma table_info("{self.table}")')]
+        if 'rounds' not in columns:
+            self.con.execute(f'alter table "{self.table}" add column rounds INTEGER')
+        self.con.commit()
+
+    def record(self, run, model, result, params):
+        self.con.execute(f'insert or replace into "{self.table}" '
+                         f'(run, model, trial, seed, accuracy, seconds, params, finished_at, rounds) '
+                         f'values (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (run, model, result['trial'], result['seed'], result['accuracy'], result['seconds'],
+                          json.dumps(params), datetime.now().isoformat(timespec='seconds'), result['rounds']))
+        self.con.commit()
+
+
+def _init_worker(dataset, store_path, features, label, nthread):
+    # every worker maps the same read-only files, the page cache holds a single copy of the data
+    store = FeatureStore.open(dataset, store_path)
+    _worker['data'] = store.ml_features() if features == 'ml' else store.ou_features()
+    _worker['label'] = store.label(label)
+    _worker['nthread'] = nthread
+
+
+def run_trial(trial, seed, params, num_rounds, test_size, early_stopping_rounds=None, valid_size=.1,
+              eval_period=0):
+    """Train and score one model on a random split, returning its metrics and the model as JSON bytes
+
+    With `early_stopping_rounds`, `valid_size` of the training rows is held out and training stops once the
+    validation loss has not improved for that many rounds, the saved model is cut at its best round.
+    `eval_period` prints the eval metrics every that many rounds.
+    """
+    start = time.monotonic()
+    nthread = _worker['nthread']
+    params = {'tree_method': 'hist', **params, 'nthread': nthread}
+    x_train, x_test, y_train, y_test = train_test_split(_worker['data'], _worker['label'], test_size=test_size,
+                                                        random_state=seed)
+    test = xgb.DMatrix(x_test, nthread=nthread)
+
+    if early_stopping_rounds:
+        x_train, x_valid, y_train, y_valid = train_test_split(x_train, y_train, test_size=valid_size,
+                                                              random_state=seed)
+        # histogram bin cuts come from the training rows only, the held-out rows reuse them
+        train = xgb.QuantileDMatrix(x_train, label=y_train, nthread=nthread)
+        valid = xgb.QuantileDMatrix(x_valid, label=y_valid, ref=train, nthread=nthread)
+        model = xgb.train(params, train, num_rounds, evals=[(valid, 'valid')],
+                          early_stopping_rounds=early_stopping_rounds, verbose_eval=eval_period or False)
+        model = model[:model.best_iteration + 1]
+    else:
+        train = xgb.QuantileDMatrix(x_train, label=y_train, nthread=nthread)
+        model = xgb.train(params, train, num_rounds, evals=[(train, 'train')] if eval_period else (),
+                          verbose_eval=eval_period or False)
+
+    predictions = model.predict(test)
+    acc = round(accuracy_score(y_test, np.argmax(predictions, axis=1)) * 100, 1)
+    return {'trial': trial, 'seed': seed, 'accuracy': acc, 'seconds': time.monotonic() - start,
+            'rounds': model.num_boosted_rounds(), 'model': bytes(model.save_raw('json'))}
+
+
+def run_trials(name, dataset, features, label, params, num_rounds, trials, model_path, workers=None, threads=1,
+               test_size=.1, seed=None, early_stopping_rounds=None, eval_period=0, store_path=store_dir,
+               results_path=results_db):
+    """Run `trials` random-split trainings across a process pool and keep the best model
+
+    Each worker trains with `threads` threads, by default the pool fills every core. Metrics of every trial go
+    to the results table as soon as it finishes, and the model is saved to `model_path` formatted with its
+    accuracy whenever it is the best so far. `features` is 'ml' or 'ou', `num_rounds` is the most rounds a trial
+    trains when `early_stopping_rounds` is set. Returns the best accuracy.
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // threads)
+    seeds = np.random.default_rng(seed).integers(2 ** 31 - 1, size=trials)
+    run = datetime.now().isoformat(timespec='seconds')
+    results = TrialResults(sqlite3.connect(results_path))
+
+    best = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dataset, store_path, features, label, threads)) as executor:
+        futures = [executor.submit(run_trial, trial, int(seeds[trial]), params, num_rounds, test_size,
+                                   early_stopping_rounds, eval_period=eval_period)
+                   for trial in range(trials)]
+        for future in tqdm(as_completed(futures), total=trials):
+            result = future.result()
+            results.record(run, name, result, params)
+            print(f"{result['accuracy']}%")
+            # only save results if they are the best so far
+            if best is None or result['accuracy'] >= best:
+                best = result['accuracy']
+                with open(model_path.format(best), 'wb') as f:
+                    f.write(result['model'])
+    results.con.close()
+    return best
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class TtlCache:
+    """Bounded cache of computed values that go stale after `ttl` seconds
+
+    A stale value is still returned immediately while a background worker recomputes it (stale-while-revalidate),
+    so callers only wait for a computation when a key has no value at all, or its value is older than
+    `max_stale` seconds. Concurrent misses of the same key share one computation (single-flight), and a miss
+    while a background refresh of the key runs waits for that refresh. Past `max_entries` keys, the least
+    recently used one is dropped.
+    """
+
+    def __init__(self, ttl, max_entries=128, max_stale=None, refresh_workers=1):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._entries = OrderedDict()
+        # one future per key being computed, by a caller on a miss or by a background refresh
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+
+    def get(self, key, compute):
+        """Value of `key`, computing it with `compute()` on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, computed_at = entry
+                age = time.monotonic() - computed_at
+                if self.max_stale is None or age < max(self.ttl, self.max_stale):
+                    self._entries.move_to_end(key)
+                    if age >= self.ttl and key not in self._inflight:
+                        future = self._inflight[key] = Future()
+                        self._executor.submit(self._refresh, key, compute, future)
+                    return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if leader:
+            self._compute(key, compute, future)
+        return future.result()
+
+    def _refresh(self, key, compute, future):
+        try:
+            self._compute(key, compute, future)
+        except Exception as e:
+            # the stale value keeps being served until a refresh succeeds
+            print(f"Refreshing {key} failed: {e}")
+
+    def _compute(self, key, compute, future):
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, value)
+            del self._inflight[key]
+        future.set_result(value)
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -1,10 +1,24 @@
+import os
 import re
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
-import requests
-
-from .Dictionaries import team_index_current
+from .Http_Client import get_http_client
+from .Schedule_Index import get_schedule_index
+from .Team_Registry import get_team_id
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+todays_games_url = 'https://data.nba.com/data/10s/v2015/json/mobile_teams/nba/2024/scores/00_todays_scores.json'
+data_url = 'https://stats.nba.com/stats/leaguedashteamstats?' \
+           'Conference=&DateFrom=&DateTo=&Division=&GameScope=&' \
+           'GameSegment=&LastNGames=0&LeagueID=00&Location=&' \
+           'MeasureType=Base&Month=0&OpponentTeamID=0&Outcome=&' \
+           'PORound=0&PaceAdjust=N&PerMode=PerGame&Period=0&' \
+           'PlayerExperience=&PlayerPosition=&PlusMinus=N&Rank=N&' \
+           'Season=2024-25&SeasonSegment=&SeasonType=Regular+Season&ShotClockRange=&' \
+           'StarterBench=&TeamID=0&TwoWay=0&VsConference=&VsDivision='
 
 games_header = {
     'user-agent': 'Mozilla/5.0 (Windows NT 6.2; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) '
@@ -16,6 +30,10 @@ games_header = {
     'Referer': 'https://github.com'
 }
 
+# seconds a cached response is used without asking the server, the team stats only change once per game night
+team_stats_ttl = 6 * 60 * 60
+todays_games_ttl = 60 * 60
+
 data_headers = {
     'Accept': 'application/json, text/plain, */*',
     'Accept-Encoding': 'gzip, deflate, br',
@@ -27,8 +45,20 @@ data_headers = {
 }
 
 
-def get_json_data(url):
-    raw_data = requests.get(url, headers=data_headers)
+def _has_json_key(key):
+    """Response check accepting only JSON objects with a non-empty `key`, so error pages are never cached"""
+    def validate(response):
+        try:
+            return bool(response.json().get(key))
+        except (ValueError, AttributeError):
+            return False
+    return validate
+
+
+def get_json_data(url, timeout=None, cache_ttl=None, client=None, budget=None):
+    client = get_http_client() if client is None else client
+    raw_data = client.get(url, headers=data_headers, timeout=timeout, cache_ttl=cache_ttl, budget=budget,
+                          validate=_has_json_key('resultSets'))
     try:
         json = raw_data.json()
     except Exception as e:
@@ -37,8 +67,9 @@ def get_json_data(url):
     return json.get('resultSets')
 
 
-def get_todays_games_json(url):
-    raw_data = requests.get(url, headers=games_header)
+def get_todays_games_json(url, timeout=None, cache_ttl=None, budget=None):
+    raw_data = get_http_client().get(url, headers=games_header, timeout=timeout, cache_ttl=cache_ttl, budget=budget,
+                                     validate=_has_json_key('gs'))
     json = raw_data.json()
     return json.get('gs').get('g')
 
@@ -67,12 +98,114 @@ def create_todays_games_from_odds(input_dict):
     games = []
     for game in input_dict.keys():
         home_team, away_team = game.split(":")
-        if home_team not in team_index_current or away_team not in team_index_current:
+        if get_team_id(home_team) is None or get_team_id(away_team) is None:
             continue
         games.append([home_team, away_team])
     return games
 
 
+def games_with_team_stats(games, df):
+    """Games whose home and away team both have a row in the team stats snapshot `df`
+
+    Games with a team missing from the snapshot, or not known to the team registry, are reported and left out.
+
+    Raises:
+        ValueError: `df` has no team stats at all, for example after a failed stats.nba.com fetch
+    """
+    if df.empty or 'TEAM_ID' not in df.columns:
+        raise ValueError("No league team stats available, cannot build today's game features")
+    team_ids = set(df['TEAM_ID'])
+    kept = []
+    for game in games:
+        if get_team_id(game[0]) in team_ids and get_team_id(game[1]) in team_ids:
+            kept.append(game)
+        else:
+            print(f"No team stats for {game[1]} @ {game[0]}, skipping the game")
+    return kept
+
+
+def create_todays_games_data(games, df, odds):
+    """Feature rows and lines of `games`, in the same order, every team needs a row in `df`
+
+    Use games_with_team_stats first to leave out games whose teams have no stats.
+    """
+    match_data = []
+    todays_games_uo = []
+    home_team_odds = []
+    away_team_odds = []
+
+    home_team_days_rest = []
+    away_team_days_rest = []
+
+    schedule_index = get_schedule_index()
+    today = datetime.today()
+    # today's stats rows keyed by franchise, so the row order of the snapshot does not matter
+    stats_by_team = df.set_index('TEAM_ID', drop=False)
+    for game in games:
+        home_team = game[0]
+        away_team = game[1]
+        home_team_id = get_team_id(home_team)
+        away_team_id = get_team_id(away_team)
+        if home_team_id not in stats_by_team.index or away_team_id not in stats_by_team.index:
+            raise ValueError(f"No team stats for {away_team} @ {home_team}")
+        if odds is not None:
+            game_odds = odds[home_team + ':' + away_team]
+            todays_games_uo.append(game_odds['under_over_odds'])
+
+            home_team_odds.append(game_odds[home_team]['money_line_odds'])
+            away_team_odds.append(game_odds[away_team]['money_line_odds'])
+
+        else:
+            todays_games_uo.append(input(home_team + ' vs ' + away_team + ': '))
+
+            home_team_odds.append(input(home_team + ' odds: '))
+            away_team_odds.append(input(away_team + ' odds: '))
+
+        # calculate days rest for both teams
+        home_days_off = schedule_index.days_rest(home_team, today)
+        away_days_off = schedule_index.days_rest(away_team, today)
+        # print(f"{away_team} days off: {away_days_off} @ {home_team} days off: {home_days_off}")
+
+        home_team_days_rest.append(home_days_off)
+        away_team_days_rest.append(away_days_off)
+        home_team_series = stats_by_team.loc[home_team_id]
+        away_team_series = stats_by_team.loc[away_team_id]
+        stats = pd.concat([home_team_series, away_team_series])
+        stats['Days-Rest-Home'] = home_days_off
+        stats['Days-Rest-Away'] = away_days_off
+        match_data.append(stats)
+
+    games_data_frame = pd.concat(match_data, ignore_index=True, axis=1)
+    games_data_frame = games_data_frame.T
+
+    frame_ml = games_data_frame.drop(columns=['TEAM_ID', 'TEAM_NAME'])
+    data = frame_ml.values
+    data = data.astype(float)
+
+    return data, todays_games_uo, frame_ml, home_team_odds, away_team_odds
+
+
+def normalize(data, axis=1):
+    """L2-normalize rows like tf.keras.utils.normalize, without importing TensorFlow"""
+    data = np.asarray(data, dtype=float)
+    l2 = np.atleast_1d(np.linalg.norm(data, 2, axis))
+    l2[l2 == 0] = 1
+    return data / np.expand_dims(l2, axis)
+
+
+def get_game_lines(games, odds):
+    """Over/under and money line odds of each game in one sportsbook's odds dictionary"""
+    todays_games_uo = []
+    home_team_odds = []
+    away_team_odds = []
+    for home_team, away_team in games:
+        game_odds = odds[home_team + ':' + away_team]
+        todays_games_uo.append(game_odds['under_over_odds'])
+        home_team_odds.append(game_odds[home_team]['money_line_odds'])
+        away_team_odds.append(game_odds[away_team]['money_line_odds'])
+    return todays_games_uo, home_team_odds, away_team_odds
+
+
 def get_date(date_string):
     year1, month, day = re.search(r'(\d+)-\d+-(\d\d)(\d\d)', date_string).groups()
     year = year1 if int(month) > 8 else int(year1) + 1